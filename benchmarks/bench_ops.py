@@ -0,0 +1,25 @@
+import argparse
+import json
+
+from graphnet.ops import OPERATIONS
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=100000, help='Количество вызовов скалярного ядра')
+    parser.add_argument('--size', type=int, default=1 << 16, help='Длина массивов для векторного ядра')
+    parser.add_argument('--json', help='Файл для результатов в формате JSON')
+    args = parser.parse_args()
+
+    results = [operation.benchmark(args.number, args.size) for operation in OPERATIONS.values()]
+    for r in results:
+        print(f'{r["operation"]:<8} arity {r["arity"]} {r["scalar_ns"]:10.1f} ns/call '
+              f'{r["vector_ns_per_element"]:8.2f} ns/element')
+
+    if args.json is not None:
+        with open(args.json, 'w') as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
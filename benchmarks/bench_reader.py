@@ -0,0 +1,75 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.legacy import read_graph as legacy_read_graph
+from graphnet.reader import iter_edges, read_graph
+
+
+def write_edge_list(file_name, arcs, vertices, seed=0):
+    rnd = random.Random(seed)
+    in_number = [0] * (vertices + 1)
+
+    with open(file_name, 'w') as output:
+        for i in range(arcs):
+            u = rnd.randint(1, vertices)
+            v = rnd.randint(1, vertices - 1)
+            if v >= u:
+                v += 1
+            in_number[v] += 1
+
+            if i:
+                output.write(',\n' if i % 10 == 0 else ', ')
+            output.write(f'({u}, {v}, {in_number[v]})')
+
+
+def measure(fun, *args):
+    started = time.perf_counter()
+    fun(*args)
+    elapsed = time.perf_counter() - started
+
+    # tracing slows the parsers down several times, so memory is measured
+    # in a separate run
+    tracemalloc.start()
+    fun(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def consume(input_file_name):
+    for _ in iter_edges(input_file_name):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--arcs', type=int, default=100000, help='Количество дуг')
+    parser.add_argument('--vertices', type=int, default=9, help='Количество вершин')
+    args = parser.parse_args()
+
+    fd, file_name = tempfile.mkstemp(suffix='.txt')
+    os.close(fd)
+
+    try:
+        write_edge_list(file_name, args.arcs, args.vertices)
+        print(f'{args.arcs} arcs, {args.vertices} vertices, {os.path.getsize(file_name)} bytes')
+
+        scenarios = [('iter_edges', consume), ('read_graph', read_graph)]
+        # the old parser reads only the first digit of a vertex id
+        if args.vertices <= 9:
+            scenarios.append(('legacy read_graph', legacy_read_graph))
+
+        for name, fun in scenarios:
+            elapsed, peak = measure(fun, file_name)
+            print(f'{name:<20} {elapsed:8.3f} s {peak / 2 ** 20:10.1f} MiB peak')
+    finally:
+        os.remove(file_name)
+
+
+if __name__ == '__main__':
+    main()
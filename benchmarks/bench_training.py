@@ -0,0 +1,66 @@
+import argparse
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from graphnet.layers import load_layer_network
+from graphnet.training import Dataset, Momentum, train
+
+
+def write_reference(directory, samples, width, depth, seed=0):
+    """Writes a chain of depth dense layers and a regression dataset for it.
+
+    The data depend on seed only, so runs on different commits train on the
+    same reference dataset.
+    """
+    rnd = np.random.default_rng(seed)
+    arcs = ', '.join(f'({v}, {v + 1}, 1)' for v in range(1, depth + 1))
+    layers = [f'1 : input {width}']
+    for v in range(2, depth + 2):
+        size = 1 if v == depth + 1 else width
+        np.save(os.path.join(directory, f'w{v}.npy'), rnd.standard_normal((width, size)) / np.sqrt(width))
+        np.save(os.path.join(directory, f'b{v}.npy'), np.zeros(size))
+        activation = 'identity' if v == depth + 1 else 'tanh'
+        layers.append(f'{v} : dense {activation} w{v}.npy b{v}.npy')
+
+    with open(os.path.join(directory, 'graph.txt'), 'w') as output:
+        output.write(arcs + '\n')
+    with open(os.path.join(directory, 'layers.txt'), 'w') as output:
+        output.write('\n'.join(layers) + '\n')
+
+    x = rnd.standard_normal((samples, width))
+    np.save(os.path.join(directory, 'x.npy'), x)
+    np.save(os.path.join(directory, 'y.npy'), np.sin(x[:, :1]) + x[:, 1:2] * x[:, 2:3])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--samples', type=int, default=100000, help='Количество примеров')
+    parser.add_argument('--width', type=int, default=256, help='Размер скрытых слоев')
+    parser.add_argument('--depth', type=int, default=3, help='Количество плотных слоев')
+    parser.add_argument('--epochs', type=int, default=3, help='Количество эпох')
+    parser.add_argument('--batch-size', type=int, default=256, dest='batch_size', help='Размер мини-батча')
+    parser.add_argument('--dtype', choices=['float64', 'float32'], default='float32', help='Тип чисел при вычислении')
+    parser.add_argument('--json', help='Файл для результатов в формате JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_reference(directory, args.samples, args.width, args.depth)
+        network = load_layer_network(os.path.join(directory, 'graph.txt'), os.path.join(directory, 'layers.txt'))
+        dataset = Dataset([(1, os.path.join(directory, 'x.npy'))], [(args.depth + 1, os.path.join(directory, 'y.npy'))])
+        optimizer = Momentum(network, 0.01, 0.9, args.dtype)
+        history = train(network, dataset, args.epochs, args.batch_size, optimizer, args.dtype)
+
+    for stats in history:
+        print(f'epoch {stats["epoch"]:<3} {stats["seconds"]:8.3f} s {stats["samples_per_second"]:12.0f} samples/s '
+              f'loss {stats["loss"]:.6g}')
+
+    if args.json is not None:
+        with open(args.json, 'w') as output:
+            json.dump({'parameters': vars(args), 'epochs': history}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
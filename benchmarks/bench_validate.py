@@ -0,0 +1,69 @@
+import argparse
+import os
+import tempfile
+
+from benchmarks.bench_reader import measure, write_edge_list
+from benchmarks.legacy import validate_input_data as legacy_validate_input_data
+from graphnet.reader import CHUNK_SIZE, _blocks, _tokenize, _well_formed, iter_blocks
+
+
+def check_syntax(input_file_name):
+    # the syntax check alone: the bytes passes of every block, and the
+    # tokenizer for a block they do not accept
+    with open(input_file_name, 'rb') as input_graph:
+        for buf, end in _blocks(input_graph, CHUNK_SIZE):
+            block = buf[:end]
+            if not _well_formed(block):
+                for _ in _tokenize(block, end, 1, input_file_name):
+                    pass
+
+
+def check_blocks(input_file_name):
+    # the syntax and vertex 0 check read_graph does block by block, without
+    # building the graph
+    for _, _, _, _, error in iter_blocks(input_file_name):
+        if error is not None:
+            raise error
+
+
+def legacy_validate(input_file_name):
+    # the preparation task1.py did before calling its validator
+    with open(input_file_name, 'r') as input_graph:
+        lines = input_graph.read().replace(' ', '').split('\n')
+
+    legacy_validate_input_data(lines, input_file_name)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--arcs', type=int, default=6000000, help='Количество дуг')
+    parser.add_argument('--vertices', type=int, default=1000, help='Количество вершин')
+    parser.add_argument('--file', help='Готовый файл со списком дуг вместо сгенерированного')
+    args = parser.parse_args()
+
+    file_name = args.file
+    if file_name is None:
+        fd, file_name = tempfile.mkstemp(suffix='.txt')
+        os.close(fd)
+
+    try:
+        if args.file is None:
+            write_edge_list(file_name, args.arcs, args.vertices)
+        print(f'{file_name}: {os.path.getsize(file_name) / 2 ** 20:.1f} MiB')
+
+        results = {}
+        for name, fun in (('syntax check', check_syntax), ('iter_blocks', check_blocks),
+                          ('legacy validate_input_data', legacy_validate)):
+            elapsed, peak = measure(fun, file_name)
+            results[name] = elapsed
+            print(f'{name:<28} {elapsed:8.3f} s {peak / 2 ** 20:10.1f} MiB peak')
+
+        for name in ('syntax check', 'iter_blocks'):
+            print(f'speedup of {name} {results["legacy validate_input_data"] / results[name]:.1f}x')
+    finally:
+        if args.file is None:
+            os.remove(file_name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import os
+import tempfile
+
+from benchmarks.bench_reader import measure, write_edge_list
+from benchmarks.legacy import to_pretty_xml
+from graphnet.reader import read_graph
+from graphnet.xml_format import write_xml
+
+
+def streaming(graph, file_name):
+    with open(file_name, 'w') as output:
+        write_xml(output, graph)
+
+
+def legacy(graph, file_name):
+    tree = to_pretty_xml(graph)
+    with open(file_name, 'w') as output:
+        output.write(tree)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--arcs', type=int, default=1000000, help='Количество дуг')
+    parser.add_argument('--vertices', type=int, default=100000, help='Количество вершин')
+    parser.add_argument('--skip-legacy', action='store_true', dest='skip_legacy', help='Не запускать ElementTree + minidom')
+    args = parser.parse_args()
+
+    fd, input_file = tempfile.mkstemp(suffix='.txt')
+    os.close(fd)
+    fd, output_file = tempfile.mkstemp(suffix='.xml')
+    os.close(fd)
+
+    try:
+        write_edge_list(input_file, args.arcs, args.vertices)
+        graph = read_graph(input_file)
+        print(f'{args.arcs} arcs, {args.vertices} vertices')
+
+        scenarios = [('write_xml', streaming)]
+        if not args.skip_legacy:
+            scenarios.append(('ElementTree + minidom', legacy))
+
+        for name, fun in scenarios:
+            elapsed, peak = measure(fun, graph, output_file)
+            print(f'{name:<22} {elapsed:8.3f} s {peak / 2 ** 20:10.1f} MiB peak')
+    finally:
+        os.remove(input_file)
+        os.remove(output_file)
+
+
+if __name__ == '__main__':
+    main()
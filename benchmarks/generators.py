@@ -0,0 +1,100 @@
+import random
+
+
+def _write_arcs(output, arcs):
+    for i, (u, v, order) in enumerate(arcs):
+        if i:
+            output.write(',\n' if i % 10 == 0 else ', ')
+        output.write(f'({u}, {v}, {order})')
+    output.write('\n')
+
+
+def _write_operations(output, operations):
+    for v, operation in enumerate(operations, 1):
+        output.write(f'{v} : {operation}\n')
+
+
+def _internal_operation(rnd, arity):
+    # operations that keep the values small enough for exact evaluation
+    if arity == 1:
+        return 'relu'
+    return 'max' if rnd.random() < 0.5 else '+'
+
+
+def layered(graph_file, operations_file, edges, width=1000, fan_in=2, seed=0):
+    """Writes a layered DAG: every vertex of a layer reads fan_in vertices of the layer before.
+
+    The first layer holds the leaves. Returns the number of vertices.
+    """
+    rnd = random.Random(seed)
+    width = min(width, max(edges // fan_in, 1))
+    layers = max(edges // (width * fan_in), 1) + 1
+
+    def arcs():
+        for layer in range(1, layers):
+            for k in range(width):
+                v = layer * width + k + 1
+                for order, u in enumerate(rnd.sample(range(width), min(fan_in, width)), 1):
+                    yield (layer - 1) * width + u + 1, v, order
+
+    operations = [rnd.randint(1, 9) for _ in range(width)]
+    operations += [_internal_operation(rnd, min(fan_in, width)) for _ in range(width * (layers - 1))]
+
+    with open(graph_file, 'w') as output:
+        _write_arcs(output, arcs())
+    with open(operations_file, 'w') as output:
+        _write_operations(output, operations)
+
+    return len(operations)
+
+
+def fan(graph_file, operations_file, edges, hubs=10, seed=0):
+    """Writes hubs with a wide fan-in from the leaves and a wide fan-out to the sinks.
+
+    Every hub sums edges / (2 * hubs) random leaves and feeds as many sinks
+    of its own. Returns the number of vertices.
+    """
+    rnd = random.Random(seed)
+    degree = max(edges // (2 * hubs), 2)
+    leaves = degree * hubs
+
+    def arcs():
+        for h in range(hubs):
+            hub = leaves + h + 1
+            for order in range(1, degree + 1):
+                yield rnd.randint(1, leaves), hub, order
+        for h in range(hubs):
+            for k in range(degree):
+                yield leaves + h + 1, leaves + hubs + h * degree + k + 1, 1
+
+    operations = [rnd.randint(1, 9) for _ in range(leaves)] + ['+'] * hubs + ['relu'] * (hubs * degree)
+
+    with open(graph_file, 'w') as output:
+        _write_arcs(output, arcs())
+    with open(operations_file, 'w') as output:
+        _write_operations(output, operations)
+
+    return len(operations)
+
+
+def chain(graph_file, operations_file, edges, seed=0):
+    """Writes a path of edges arcs from a single leaf to a single sink.
+
+    Returns the number of vertices.
+    """
+    rnd = random.Random(seed)
+    operations = [rnd.randint(1, 9)] + ['relu'] * edges
+
+    with open(graph_file, 'w') as output:
+        _write_arcs(output, ((v, v + 1, 1) for v in range(1, edges + 1)))
+    with open(operations_file, 'w') as output:
+        _write_operations(output, operations)
+
+    return len(operations)
+
+
+GENERATORS = {
+    'layered': layered,
+    'fan': fan,
+    'chain': chain,
+}
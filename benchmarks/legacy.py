@@ -0,0 +1,104 @@
+# Parser of task1.py before the streaming tokenizer, kept as the baseline for
+# the benchmarks. Vertex ids are limited to a single digit.
+from graphnet.exceptions import InputException, DataException
+
+
+def validate_input_data(lines, input_file_name):
+    for j in range(len(lines)):
+        if '-' in lines[j]:
+            raise InputException(input_file_name, j + 1)
+
+        for e in lines[j]:
+            if e.isalpha():
+                raise InputException(input_file_name, j + 1)
+
+
+    return True
+
+
+def read_graph(input_file_name):
+
+    with open(input_file_name, 'r') as input_graph:
+        edges = {}
+
+        lines = input_graph.read()
+        lines = lines.replace(' ', '')
+        lines = lines.split('\n')
+
+        validate_input_data(lines, input_file_name)
+
+        es = ''.join(lines)
+        es = es.split('),(')
+        max_vertex = max(int(es[0][1]), int(es[0][3]))
+
+        for i in range(1, len(es)):
+            max_vertex = max(max_vertex, int(es[i][0]), int(es[i][2]))
+
+        in_number = [""] * max_vertex
+
+        for i in range(len(es)):
+            if i == 0:
+                es[i] = es[i][1:]
+            if i == len(es) - 1:
+                if es[i][len(es[i]) - 1] == '\n':
+                    es[i] = es[i][:len(es[i]) - 2]
+                else:
+                    es[i] = es[i][:-1]
+            try:
+                edge = eval(es[i])
+                if len(edge) != 3:
+                    edge = str(edge).replace(" ", '')
+                    for j in range(len(lines)):
+                        if edge in lines[j]:
+                            raise InputException(input_file_name, j + 1)
+            except SyntaxError:
+                edge = str(edge).replace(" ", '')
+                for j in range(len(lines)):
+                    if edge in lines[j]:
+                        raise InputException(input_file_name, j + 1)
+
+            if edge[0] not in edges:
+                edges[edge[0]] = []
+            if edge[1] not in edges:
+                edges[edge[1]] = []
+
+            in_number[edge[1] - 1] = in_number[edge[1] - 1] + " " + str(edge[2])
+            edges[edge[0]].append([edge[2], edge[1]])
+    y = []
+
+    for x in in_number:
+        y.append(x.split(" "))
+    for i in range(len(y)):
+        num = []
+        for j in range(1, len(y[i])):
+            num.append(int(y[i][j]))
+        num.sort()
+        if len(num) == 1 and num[0] != 1:
+            raise DataException(input_file_name, len(lines), 'Неправильная нумерация')
+        for j in range(0, len(num) - 1):
+            if num[j] == num[j + 1]:
+                raise DataException(input_file_name, len(lines), 'Неправильная нумерация')
+            if num[j + 1] - num[j] != 1:
+                raise DataException(input_file_name, len(lines), 'Неправильная нумерация')
+    return edges
+
+
+def to_pretty_xml(graph):
+    # ElementTree + minidom path of task1.main before the streaming writer
+    import xml.etree.cElementTree as ET
+    from xml.dom import minidom
+
+    root = ET.Element("graph")
+
+    for x in range(1, len(graph) + 1):
+        ET.SubElement(root, "vertex").text = 'v' + str(x)
+    for x in range(1, len(graph) + 1):
+        targets, orders = graph.out_arcs(x)
+        for to, order in zip(targets, orders):
+            arc = ET.SubElement(root, "arc")
+            ET.SubElement(arc, 'from').text = 'v' + str(x)
+            ET.SubElement(arc, 'to').text = 'v' + str(to)
+            ET.SubElement(arc, 'order').text = str(order)
+
+    dom = minidom.parseString(ET.tostring(root))
+    return dom.toprettyxml(indent='\t')
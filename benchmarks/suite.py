@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.generators import GENERATORS
+from graphnet.operations import operations_reading_in_format, check_operation_correctness
+from graphnet.plan import compile_plan, evaluate
+from graphnet.prefix import cycle_finding
+from graphnet.reader import read_graph
+from graphnet.topology import topological_order
+from graphnet.xml_format import write_xml
+
+
+def to_xml(files, graph):
+    with open(files['output'], 'w') as output:
+        write_xml(output, graph)
+
+
+def to_prefix(files, graph):
+    # plain prefix expressions unfold the DAG into a tree, which is
+    # exponential in the depth of a layered graph
+    with open(files['output'], 'w') as output:
+        cycle_finding(graph, topological_order(graph), output, shared=True)
+
+
+def evaluation(files, graph):
+    operations = operations_reading_in_format(graph, files['operations'])
+    check_operation_correctness(graph, operations, files['operations'])
+    evaluate(compile_plan(graph, topological_order(graph), operations))
+
+
+SCENARIOS = {
+    'read_graph': lambda files, graph: read_graph(files['graph']),
+    'task1 xml': to_xml,
+    'task2 cycle_finding --shared': to_prefix,
+    'task3 evaluate': evaluation,
+}
+
+
+def run(fun, files, graph, repeat, memory):
+    # the best of repeat runs, the others are slowed down by the machine
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fun(files, graph)
+        timings.append(time.perf_counter() - started)
+    result = {'seconds': min(timings)}
+
+    if memory:
+        tracemalloc.start()
+        fun(files, graph)
+        result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return result
+
+
+def commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold, min_seconds=0.01):
+    """Prints the ratio of every timing to the baseline, returns the number of regressions.
+
+    Timings shorter than min_seconds in the baseline are mostly noise and
+    are never counted as regressions.
+    """
+    known = {(r['generator'], r['edges'], r['scenario']): r for r in baseline['results']}
+    regressions = 0
+    for r in results:
+        base = known.get((r['generator'], r['edges'], r['scenario']))
+        if base is None:
+            continue
+        ratio = r['seconds'] / base['seconds'] if base['seconds'] else 1.0
+        regressed = ratio > threshold and base['seconds'] >= min_seconds
+        regressions += regressed
+        print(f'{r["generator"]:<8} {r["edges"]:>9} {r["scenario"]:<29} {ratio:6.2f}x{"  REGRESSION" if regressed else ""}')
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='Количество дуг')
+    parser.add_argument('--generators', nargs='+', choices=list(GENERATORS), default=list(GENERATORS),
+                        help='Генераторы графов')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS),
+                        help='Замеряемые сценарии')
+    parser.add_argument('--repeat', type=int, default=3, help='Количество запусков, берется лучшее время')
+    parser.add_argument('--memory', action='store_true', help='Измерять пиковую память отдельным запуском')
+    parser.add_argument('--json', help='Файл для результатов в формате JSON')
+    parser.add_argument('--compare', help='JSON с результатами предыдущего запуска для сравнения')
+    parser.add_argument('--threshold', type=float, default=1.2, help='Во сколько раз медленнее считается регрессией')
+    parser.add_argument('--min-seconds', type=float, default=0.01,
+                        help='Более короткие замеры не считаются регрессией')
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        files = {name: os.path.join(directory, name) for name in ('graph', 'operations', 'output')}
+
+        for generator in args.generators:
+            for edges in args.sizes:
+                vertices = GENERATORS[generator](files['graph'], files['operations'], edges)
+                graph = read_graph(files['graph'])
+
+                for scenario in args.scenarios:
+                    result = {'generator': generator, 'edges': graph.arcs_count(), 'vertices': vertices,
+                              'scenario': scenario}
+                    result.update(run(SCENARIOS[scenario], files, graph, args.repeat, args.memory))
+                    results.append(result)
+                    print(f'{generator:<8} {graph.arcs_count():>9} {scenario:<29} {result["seconds"]:8.3f} s'
+                          + (f' {result["peak_bytes"] / 2 ** 20:10.1f} MiB peak' if args.memory else ''))
+
+    report = {
+        'commit': commit(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+    if args.json is not None:
+        with open(args.json, 'w') as output:
+            json.dump(report, output, indent=2, ensure_ascii=False)
+
+    if args.compare is not None:
+        with open(args.compare, 'r') as baseline:
+            if compare(results, json.load(baseline), args.threshold, args.min_seconds):
+                sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+import numpy as np
+
+from graphnet.exceptions import OperationFormatException
+from graphnet.grad import backward, cone_leaves
+from graphnet.plan import kernels
+
+CHUNK_ROWS = 1 << 16
+
+
+def read_leaf_values(file_name, plan):
+    """Reads the matrix of leaf values, one row per sample.
+
+    A .npy file holds one column per leaf, in ascending vertex order, and is
+    memory-mapped. A CSV file starts with a header of leaf vertex ids, leaves
+    missing from it keep their constants from the operations file.
+
+    Returns the list of vertices of the columns and the matrix.
+    """
+    leaves = set(plan.vertices[:plan.leaves])
+
+    if file_name.endswith('.npy'):
+        matrix = np.load(file_name, mmap_mode='r')
+        columns = sorted(leaves)
+    else:
+        with open(file_name, 'r') as input_values:
+            header = input_values.readline()
+        try:
+            columns = [int(x) for x in header.split(',')]
+        except ValueError:
+            raise OperationFormatException(file_name, 1, 'Заголовок должен содержать номера листовых вершин', kind='данных')
+        matrix = np.loadtxt(file_name, delimiter=',', skiprows=1, ndmin=2)
+
+    for v in columns:
+        if v not in leaves:
+            raise OperationFormatException(file_name, 1, f'Вершина \'{v}\' не является листом графа', kind='данных')
+    if matrix.ndim != 2 or matrix.shape[1] != len(columns):
+        raise OperationFormatException(file_name, '', f'Ожидалось столбцов: {len(columns)}', kind='данных')
+
+    return columns, matrix
+
+
+def _last_uses(plan):
+    last_use = list(range(len(plan)))
+    for i in range(plan.leaves, len(plan)):
+        for k in range(plan.arg_offsets[i], plan.arg_offsets[i + 1]):
+            last_use[plan.args[k]] = i
+    for s in plan.output_slots:
+        last_use[s] = len(plan)
+
+    return last_use
+
+
+def _forward(plan, column, block, dtype, last_use=None):
+    # values of all slots over block, slots after their last use are dropped
+    # when last_use is given
+    opcodes, arg_offsets, args = plan.opcodes, plan.arg_offsets, plan.args
+    vector = kernels('vector')
+    rows = len(block)
+    values = [None] * len(plan)
+
+    for i in range(plan.leaves):
+        v = plan.vertices[i]
+        if v in column:
+            values[i] = np.array(block[:, column[v]], dtype=dtype)
+        else:
+            values[i] = np.full(rows, plan.constants[i], dtype=dtype)
+
+    for i in range(plan.leaves, len(plan)):
+        slots = args[arg_offsets[i]:arg_offsets[i + 1]]
+        with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+            values[i] = vector[opcodes[i]]([values[s] for s in slots])
+
+        if last_use is not None:
+            # drop intermediate results nobody reads any more
+            for s in slots:
+                if last_use[s] == i:
+                    values[s] = None
+
+    return values
+
+
+def evaluate_batch(plan, columns, matrix, chunk_rows=CHUNK_ROWS, dtype=np.float64):
+    """Evaluates plan over every row of matrix.
+
+    Rows are processed in blocks of chunk_rows, every instruction is one
+    NumPy operation over the block of dtype. Yields one array per block with
+    a column for each of plan.outputs.
+    """
+    column = {v: i for i, v in enumerate(columns)}
+    last_use = _last_uses(plan)
+
+    for lo in range(0, len(matrix), chunk_rows):
+        values = _forward(plan, column, matrix[lo:lo + chunk_rows], dtype, last_use)
+
+        yield np.column_stack([values[s] for s in plan.output_slots])
+
+
+def gradient_columns(plan):
+    """Returns the (sink, leaf) pairs of the columns of gradient_batch."""
+    pairs = []
+    for v, s in zip(plan.outputs, plan.output_slots):
+        pairs.extend((v, leaf) for leaf in sorted(cone_leaves(plan, s)))
+
+    return pairs
+
+
+def gradient_batch(plan, columns, matrix, chunk_rows=CHUNK_ROWS, dtype=np.float64):
+    """Computes d(sink)/d(leaf) over every row of matrix.
+
+    The forward pass keeps the values of all slots of a block, the reverse
+    sweeps of graphnet.grad.backward then run on whole columns. Yields one
+    array per block with a column for each pair of gradient_columns.
+    """
+    column = {v: i for i, v in enumerate(columns)}
+    pairs = gradient_columns(plan)
+
+    for lo in range(0, len(matrix), chunk_rows):
+        block = matrix[lo:lo + chunk_rows]
+        values = _forward(plan, column, block, dtype)
+        derivatives = {}
+        for v, s in zip(plan.outputs, plan.output_slots):
+            with np.errstate(over='ignore', invalid='ignore'):
+                for leaf, d in backward(plan, values, s).items():
+                    derivatives[v, leaf] = d
+
+        yield np.column_stack([np.broadcast_to(derivatives[pair], len(block)) for pair in pairs])
+
+
+def write_batch(out, plan, blocks):
+    out.write(','.join(str(v) for v in plan.outputs) + '\n')
+    for block in blocks:
+        np.savetxt(out, block, delimiter=',', fmt='%.17g')
+
+
+def write_gradient_batch(out, plan, blocks):
+    out.write(','.join(f'd{v}/d{leaf}' for v, leaf in gradient_columns(plan)) + '\n')
+    for block in blocks:
+        np.savetxt(out, block, delimiter=',', fmt='%.17g')
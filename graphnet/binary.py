@@ -0,0 +1,130 @@
+import mmap
+import struct
+import sys
+from array import array
+
+from graphnet.exceptions import DataException, OperationFormatException
+from graphnet.graph import Graph
+from graphnet.ops import NAMES, OPCODES
+
+MAGIC = b'GNB1'
+HAS_ORDER = 1
+HAS_OPERATIONS = 2
+NO_OPERATION = -1
+CONSTANT = 0
+
+# magic, flags, vertices, arcs, padding
+_HEADER = struct.Struct('<4sIIQI')
+_LIMIT = 2 ** 31 - 1
+
+
+def is_binary(file_name):
+    with open(file_name, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _padding(n):
+    return -n % 8
+
+
+def write_binary(out, graph, order=None, operations=None, file_name=''):
+    """Writes graph to the binary file object out.
+
+    The header is followed by int32 arrays in native byte order: offsets,
+    targets, orders, in_offsets, sources, in_orders, then the topological
+    order if given. With operations, an int8 opcode and an int64 constant
+    per vertex follow, opcodes use the codes of graphnet.ops.
+    """
+    if len(graph) > _LIMIT or graph.arcs_count() > _LIMIT:
+        raise DataException(file_name, '', 'Граф слишком велик для двоичного формата')
+
+    flags = 0
+    if order is not None:
+        flags |= HAS_ORDER
+    if operations is not None:
+        flags |= HAS_OPERATIONS
+
+    out.write(_HEADER.pack(MAGIC, flags, len(graph), graph.arcs_count(), 0))
+    columns = [graph.offsets, graph.targets, graph.orders, graph.in_offsets, graph.sources, graph.in_orders]
+    if order is not None:
+        columns.append(order)
+    for column in columns:
+        data = array('i', column).tobytes()
+        out.write(data)
+        out.write(bytes(_padding(len(data))))
+
+    if operations is None:
+        return
+
+    opcodes = array('b', [NO_OPERATION]) * (len(graph) + 1)
+    constants = array('q', [0]) * (len(graph) + 1)
+    for v in range(1, len(graph) + 1):
+        operation = operations.get(str(v))
+        if operation is None:
+            continue
+        if type(operation) == int:
+            opcodes[v] = CONSTANT
+            try:
+                constants[v] = operation
+            except OverflowError:
+                raise OperationFormatException(file_name, '', f'Константа вершины \'{v}\' не помещается в 64 бита')
+        else:
+            opcodes[v] = OPCODES[operation]
+
+    out.write(opcodes.tobytes())
+    out.write(bytes(_padding(len(opcodes))))
+    out.write(constants.tobytes())
+
+
+def read_binary(file_name):
+    """Maps a binary graph file into memory.
+
+    Returns (graph, order, operations). The graph arrays and the order are
+    memoryviews over the mapping, nothing is parsed. order and operations
+    are None when the file has none.
+    """
+    with open(file_name, 'rb') as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapping)
+    magic, flags, size, arcs, _ = _HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise DataException(file_name, 1, 'Неизвестный формат файла')
+
+    pos = _HEADER.size
+
+    def take(length, typecode, itemsize):
+        nonlocal pos
+        end = pos + length * itemsize
+        if end > len(view):
+            raise DataException(file_name, '', 'Файл графа обрезан')
+        column = view[pos:end].cast(typecode)
+        pos = end + _padding(end)
+        return column
+
+    columns = [take(n, 'i', 4) for n in (size + 2, arcs, arcs, size + 2, arcs, arcs)]
+    graph = Graph(*columns)
+    order = take(size, 'i', 4) if flags & HAS_ORDER else None
+
+    operations = None
+    if flags & HAS_OPERATIONS:
+        opcodes = take(size + 1, 'b', 1)
+        constants = take(size + 1, 'q', 8)
+        operations = {}
+        for v in range(1, size + 1):
+            if opcodes[v] == CONSTANT:
+                operations[str(v)] = constants[v]
+            elif opcodes[v] != NO_OPERATION:
+                operations[str(v)] = NAMES[opcodes[v]]
+
+    return graph, order, operations
+
+
+def save_binary(output_file_name, graph, order=None, operations=None):
+    if output_file_name is None:
+        write_binary(sys.stdout.buffer, graph, order, operations)
+        sys.stdout.buffer.flush()
+        return
+
+    with open(output_file_name, 'wb') as out:
+        write_binary(out, graph, order, operations, output_file_name)
@@ -0,0 +1,291 @@
+import hashlib
+import logging
+import os
+import pickle
+import struct
+import tempfile
+from array import array
+
+from graphnet.binary import is_binary, read_binary
+from graphnet.graph import Graph
+from graphnet.profiling import stage
+from graphnet.reader import read_graph
+from graphnet.topology import topological_order
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = b'graphnet-cache-1'
+MAGIC = b'GNC1'
+DEFAULT_MAX_SIZE = 1 << 30
+
+_HEADER = struct.Struct('<4sI')
+_ARRAY = struct.Struct('<cQ')
+
+
+def default_directory():
+    directory = os.environ.get('GRAPHNET_CACHE_DIR')
+    if directory:
+        return directory
+
+    return os.path.join(os.path.expanduser('~'), '.cache', 'graphnet')
+
+
+def file_digest(file_name):
+    digest = hashlib.sha256()
+    with open(file_name, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+
+    return digest.digest()
+
+
+def _write_arrays(f, arrays):
+    f.write(_HEADER.pack(MAGIC, len(arrays)))
+    for a in arrays:
+        f.write(_ARRAY.pack(a.typecode.encode(), len(a)))
+        a.tofile(f)
+
+
+def _read_arrays(f):
+    magic, count = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != MAGIC:
+        raise ValueError('not a graph cache file')
+
+    arrays = []
+    for _ in range(count):
+        typecode, length = _ARRAY.unpack(f.read(_ARRAY.size))
+        a = array(typecode.decode())
+        a.fromfile(f, length)
+        arrays.append(a)
+
+    return arrays
+
+
+class GraphCache:
+    """Directory of parsed graphs and compiled plans keyed by file contents.
+
+    Graphs are stored as raw arrays, plans are pickled. Entries are evicted
+    least recently used first when the directory grows over max_size bytes.
+    A directory that cannot be written only logs a warning, the program
+    goes on without storing.
+
+    Attributes:
+        directory -- cache directory
+        max_size -- size limit of the directory in bytes
+    """
+
+    def __init__(self, directory=None, max_size=None):
+        self.directory = directory or default_directory()
+        if max_size is None:
+            max_size = int(os.environ.get('GRAPHNET_CACHE_SIZE', DEFAULT_MAX_SIZE))
+        self.max_size = max_size
+        self._digests = {}
+
+    def key(self, *file_names):
+        digest = hashlib.sha256(FORMAT_VERSION)
+        for file_name in file_names:
+            stat = os.stat(file_name)
+            known = (os.path.abspath(file_name), stat.st_mtime_ns, stat.st_size)
+            if known not in self._digests:
+                self._digests[known] = file_digest(file_name)
+            digest.update(self._digests[known])
+
+        return digest.hexdigest()
+
+    def load_graph(self, key):
+        """Returns (graph, order) stored under key, order may be None."""
+        arrays = self._load(key + '.graph', _read_arrays)
+        if arrays is None:
+            return None
+
+        graph = Graph(*arrays[:6])
+        order = arrays[6] if len(arrays) > 6 else None
+
+        return graph, order
+
+    def store_graph(self, key, graph, order=None):
+        arrays = [graph.offsets, graph.targets, graph.orders, graph.in_offsets, graph.sources, graph.in_orders]
+        if order is not None:
+            arrays.append(order)
+
+        self._store(key + '.graph', lambda f: _write_arrays(f, arrays))
+
+    def load_plan(self, key):
+        return self._load(key + '.plan', pickle.load)
+
+    def store_plan(self, key, plan):
+        self._store(key + '.plan', lambda f: pickle.dump(plan, f, pickle.HIGHEST_PROTOCOL))
+
+    def _load(self, name, read):
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, 'rb') as f:
+                value = read(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError, struct.error, pickle.UnpicklingError):
+            # a damaged entry is dropped and rebuilt
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            # a read-only directory keeps its entries, only the eviction order suffers
+            pass
+        return value
+
+    def _store(self, name, write):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        except OSError as e:
+            logger.warning('Не удалось записать в кэш %s: %s', self.directory, e)
+            return
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp, os.path.join(self.directory, name))
+        except OSError as e:
+            self._remove(tmp)
+            logger.warning('Не удалось записать в кэш %s: %s', self.directory, e)
+            return
+        except BaseException:
+            self._remove(tmp)
+            raise
+
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError as e:
+            logger.warning('Не удалось прочитать каталог кэша %s: %s', self.directory, e)
+            return
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class MemoryCache(GraphCache):
+    """GraphCache that keeps the last entries in memory as well.
+
+    Meant for one process running many jobs over the same files: a graph or
+    plan used again is neither parsed nor read from the directory. Without
+    disk the directory is not used at all.
+
+    Attributes:
+        entries -- number of graphs and of plans kept in memory
+        disk -- whether the directory is used behind the memory
+    """
+
+    def __init__(self, directory=None, max_size=None, entries=64, disk=True):
+        super().__init__(directory, max_size)
+        self.entries = entries
+        self.disk = disk
+        self._graphs = {}
+        self._plans = {}
+
+    def load_graph(self, key):
+        if key not in self._graphs and self.disk:
+            entry = super().load_graph(key)
+            if entry is not None:
+                self._keep(self._graphs, key, entry)
+
+        return self._graphs.get(key)
+
+    def store_graph(self, key, graph, order=None):
+        self._keep(self._graphs, key, (graph, order))
+        if self.disk:
+            super().store_graph(key, graph, order)
+
+    def load_plan(self, key):
+        if key not in self._plans and self.disk:
+            plan = super().load_plan(key)
+            if plan is not None:
+                self._keep(self._plans, key, plan)
+
+        return self._plans.get(key)
+
+    def store_plan(self, key, plan):
+        self._keep(self._plans, key, plan)
+        if self.disk:
+            super().store_plan(key, plan)
+
+    def _keep(self, entries, key, value):
+        # dicts keep the insertion order, the first key is the oldest
+        entries.pop(key, None)
+        entries[key] = value
+        if len(entries) > self.entries:
+            del entries[next(iter(entries))]
+
+
+def load_graph(input_file_name, cache=None, ordered=True):
+    """Reads a graph through the cache.
+
+    Returns (graph, order), order is the topological order when ordered is
+    set and None otherwise. Without cache this is read_graph followed by
+    topological_order. Binary graph files are memory-mapped and bypass the
+    cache.
+    """
+    if is_binary(input_file_name):
+        with stage('read binary') as loaded:
+            graph, order, _ = read_binary(input_file_name)
+            loaded.items = graph.arcs_count()
+        if ordered and order is None:
+            order = _order(graph)
+        return graph, order
+
+    if cache is None:
+        graph = _read(input_file_name)
+        return graph, _order(graph) if ordered else None
+
+    with stage('cache lookup') as lookup:
+        key = cache.key(input_file_name)
+        entry = cache.load_graph(key)
+        lookup.items = int(entry is not None)
+    if entry is None:
+        graph, order = _read(input_file_name), None
+    else:
+        graph, order = entry
+        if order is not None or not ordered:
+            return graph, order
+
+    if ordered:
+        order = _order(graph)
+    with stage('cache store'):
+        cache.store_graph(key, graph, order)
+
+    return graph, order
+
+
+def _read(input_file_name):
+    with stage('read_graph') as read:
+        graph = read_graph(input_file_name)
+        read.items = graph.arcs_count()
+
+    return graph
+
+
+def _order(graph):
+    with stage('topological_order') as ordered:
+        order = topological_order(graph)
+        ordered.items = len(order)
+
+    return order
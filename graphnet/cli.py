@@ -0,0 +1,404 @@
+import argparse
+import logging
+import sys
+
+from graphnet.exceptions import InputException, DataException, CycleException, OperationFormatException
+from graphnet.profiling import add_profile_arguments, profiler_from_arguments, stage
+
+logger = logging.getLogger(__name__)
+
+# Only the modules every command needs are imported at the top. Each command
+# imports the rest itself, so that a small graph converted to XML does not
+# pay for NumPy, multiprocessing or the evaluation backends.
+
+
+def file_arguments(parser):
+    parser.add_argument('-i', '--input', required=True, help='Имя входного файла')
+    parser.add_argument('-o', '--output', help='Имя выходного файла')
+
+
+def to_xml_arguments(parser):
+    file_arguments(parser)
+    parser.add_argument('--format', choices=['xml', 'bin'], default='xml', help='Формат выходного файла')
+
+
+def to_xml(args, cache):
+    from graphnet.binary import save_binary
+    from graphnet.cache import load_graph
+    from graphnet.xml_format import write_xml
+
+    with stage('load') as loaded:
+        graph = load_graph(args.input, cache, ordered=False)[0]
+        loaded.items = graph.arcs_count()
+
+    with stage('write') as written:
+        if args.format == 'bin':
+            save_binary(args.output, graph)
+        elif args.output is not None:
+            with open(args.output, 'w') as file:
+                write_xml(file, graph)
+        else:
+            write_xml(sys.stdout, graph)
+            print()
+        written.items = len(graph)
+
+
+def to_prefix_arguments(parser):
+    file_arguments(parser)
+    parser.add_argument('--shared', action='store_true', help='Выводить общие подвыражения один раз через let')
+    parser.add_argument('--format', choices=['text', 'bin'], default='text', help='Формат выходного файла')
+
+
+def to_prefix(args, cache):
+    from graphnet.binary import save_binary
+    from graphnet.cache import load_graph
+    from graphnet.prefix import cycle_finding
+
+    with stage('load') as loaded:
+        graph, order = load_graph(args.input, cache)
+        loaded.items = graph.arcs_count()
+
+    with stage('write') as written:
+        if args.format == 'bin':
+            save_binary(args.output, graph, order)
+        elif args.output is not None:
+            with open(args.output, 'w') as file:
+                cycle_finding(graph, order, file, args.shared)
+        else:
+            cycle_finding(graph, order, sys.stdout, args.shared)
+            print()
+        written.items = len(graph.sinks())
+
+
+def eval_arguments(parser):
+    file_arguments(parser)
+    parser.add_argument('--operations', help='Имя файла с описанием операций')
+    parser.add_argument('--batch', help='Файл со значениями листьев (CSV или .npy), по строке на каждый набор')
+    parser.add_argument('--workers', type=int, default=1, help='Количество процессов для вычисления стоков')
+    parser.add_argument('--numeric', choices=['exact', 'float', 'log', 'float32'], default='exact',
+                        help='Способ вычислений: точный, float с переполнением в inf, логарифмический или float32')
+    parser.add_argument('--grad', action='store_true', help='Вывести производные стоков по листьям')
+    parser.add_argument('--optimize', nargs='?', const='cse', choices=['cse', 'fold'],
+                        help='Объединить одинаковые вершины (cse), а также заранее вычислить константные '
+                             'подвыражения (fold)')
+    parser.add_argument('--format', choices=['text', 'bin'], default='text', help='Формат выходного файла')
+
+
+def check_eval(parser, args):
+    if args.workers > 1 and args.numeric != 'exact':
+        parser.error('--workers можно использовать только с --numeric exact')
+    if args.grad and args.numeric == 'log':
+        parser.error('--grad нельзя использовать с --numeric log')
+    if args.optimize is not None and args.batch is not None:
+        parser.error('--optimize нельзя использовать с --batch')
+    if args.optimize == 'fold' and args.grad:
+        parser.error('--optimize fold нельзя использовать с --grad, листья заменяются константами')
+
+
+def evaluate_network(args, cache):
+    from graphnet.binary import save_binary
+    from graphnet.operations import load_network
+
+    with stage('load') as loaded:
+        graph, order, plan, operations = load_network(args.input, args.operations, cache)
+        loaded.items = graph.arcs_count()
+
+    start = graph.sinks()
+
+    if args.format == 'bin':
+        with stage('write'):
+            save_binary(args.output, graph, order, operations)
+        return
+
+    if args.batch is not None:
+        from graphnet.batch import read_leaf_values, evaluate_batch, gradient_batch, write_batch, \
+            write_gradient_batch
+
+        with stage('read batch') as read:
+            columns, matrix = read_leaf_values(args.batch, plan)
+            read.items = len(matrix)
+        dtype = 'float32' if args.numeric == 'float32' else 'float64'
+        if args.grad:
+            blocks, write = gradient_batch(plan, columns, matrix, dtype=dtype), write_gradient_batch
+        else:
+            blocks, write = evaluate_batch(plan, columns, matrix, dtype=dtype), write_batch
+        # the blocks are computed lazily while they are written
+        with stage('evaluate and write') as written:
+            if args.output is not None:
+                with open(args.output, 'w') as file:
+                    write(file, plan, blocks)
+            else:
+                write(sys.stdout, plan, blocks)
+            written.items = len(matrix)
+        return
+
+    from graphnet.numeric import BACKENDS, evaluate
+    from graphnet.prefix import prefix_expressions
+
+    # vertex computing every sink and the original vertex of every vertex,
+    # the optimization replaces the graph by a smaller one
+    node = {v: v for v in start}
+    original = int
+    if args.optimize is not None:
+        from graphnet.optimize import optimize
+        from graphnet.plan import compile_plan
+
+        with stage('optimize') as optimized:
+            reduction = optimize(graph, order, operations, fold=args.optimize == 'fold',
+                                 kernel='scalar' if args.numeric == 'exact' else 'floating')
+            graph, order, operations = reduction.graph, reduction.order, reduction.operations
+            node = dict(zip(start, reduction.outputs))
+            original = reduction.originals.__getitem__
+            plan = compile_plan(graph, order, operations, sorted(set(reduction.outputs)))
+            optimized.items = reduction.removed
+        logger.info('Удалено вершин: %s, объединено одинаковых: %s, свернуто в константы: %s', reduction.removed,
+                    reduction.merged, reduction.folded)
+
+    with stage('evaluate') as evaluated:
+        if args.workers > 1:
+            from graphnet.parallel import evaluate_parallel
+
+            values = evaluate_parallel(plan, args.workers)
+        else:
+            values = evaluate(plan, args.numeric)
+        evaluated.items = len(plan) - plan.leaves
+
+    with stage('prefix') as prefixed:
+        outputs = sorted(set(node.values()))
+        fun = prefix_expressions(graph, lambda v: str(original(v)), outputs)
+        new_fun = prefix_expressions(graph, lambda v: str(operations[str(v)]), outputs)
+
+        # a sink merged into another vertex keeps its own id at the top of
+        # its line, the vertices below show the ids they were merged into
+        result = ''.join(f'{v}{fun[node[v]][len(str(original(node[v]))):]} = {new_fun[node[v]]} = '
+                         f'{values[node[v]]}\n' for v in start)
+        prefixed.items = len(start)
+
+    if args.grad:
+        from graphnet.grad import gradients
+
+        with stage('gradients') as derived:
+            grads = gradients(plan, forward=BACKENDS[args.numeric])
+            result += ''.join(', '.join(f'd{v}/d{leaf} = {d}' for leaf, d in
+                                        sorted((original(leaf), d) for leaf, d in grads[node[v]].items())) + '\n'
+                              for v in start)
+            derived.items = sum(len(grads[node[v]]) for v in start)
+
+    with stage('write'):
+        if args.output is not None:
+            with open(args.output, 'w') as file:
+                file.write(result)
+        else:
+            print(result)
+
+
+def jobs_arguments(parser):
+    file_arguments(parser)
+    parser.add_argument('--workers', type=int, default=1, help='Количество процессов для выполнения заданий')
+
+
+def run_jobs(args, cache):
+    from graphnet.jobs import run_jobs_file
+
+    run_jobs_file(args.input, args.output, cache, args.workers)
+
+
+def layer_network_arguments(parser):
+    parser.add_argument('-i', '--input', required=True, help='Имя файла с графом слоев')
+    parser.add_argument('--layers', required=True, help='Имя файла с описанием слоев')
+    parser.add_argument('--data', action='append', nargs=2, required=True, metavar=('VERTEX', 'FILE'),
+                        help='Входной слой и файл с его значениями (CSV или .npy), по строке на каждый пример')
+    parser.add_argument('--dtype', choices=['float64', 'float32'], default='float64', help='Тип чисел при вычислении')
+
+
+def layers_arguments(parser):
+    layer_network_arguments(parser)
+    parser.add_argument('-o', '--output', help='Имя выходного файла')
+
+
+def forward_layers(args, cache):
+    from graphnet.layers import load_layer_network, read_inputs, write_outputs
+
+    with stage('load') as loaded:
+        network = load_layer_network(args.input, args.layers, cache)
+        loaded.items = network.graph.arcs_count()
+    with stage('read data'):
+        inputs = read_inputs(network, args.data)
+
+    # the blocks are computed lazily while they are written
+    with stage('evaluate and write'):
+        blocks = network.forward_batches(inputs, dtype=args.dtype)
+        if args.output is not None:
+            with open(args.output, 'w') as file:
+                write_outputs(file, network, blocks)
+        else:
+            write_outputs(sys.stdout, network, blocks)
+
+
+def train_arguments(parser):
+    layer_network_arguments(parser)
+    parser.add_argument('--target', action='append', nargs=2, required=True, metavar=('VERTEX', 'FILE'),
+                        help='Выходной слой и файл с его ожидаемыми значениями')
+    parser.add_argument('--epochs', type=int, default=1, help='Количество эпох')
+    parser.add_argument('--batch-size', type=int, default=32, dest='batch_size', help='Размер мини-батча')
+    parser.add_argument('--learning-rate', type=float, default=0.01, dest='learning_rate', help='Шаг обучения')
+    parser.add_argument('--momentum', type=float, default=0.0, help='Коэффициент момента, 0 - обычный SGD')
+    parser.add_argument('--checkpoint', help='Файл .npz, в который сохраняются веса после каждой эпохи')
+    parser.add_argument('--resume', action='store_true', help='Начать с весов из файла --checkpoint')
+
+
+def check_train(parser, args):
+    if args.resume and args.checkpoint is None:
+        parser.error('--resume требует --checkpoint')
+
+
+def train_network(args, cache):
+    from graphnet.exceptions import OperationFormatException
+    from graphnet.layers import load_layer_network
+    from graphnet.training import Dataset, Momentum, load_checkpoint, train
+
+    with stage('load') as loaded:
+        network = load_layer_network(args.input, args.layers, cache)
+        loaded.items = network.graph.arcs_count()
+
+    data = [(int(v), f) for v, f in args.data if v.isdigit()]
+    targets = [(int(v), f) for v, f in args.target if v.isdigit()]
+    if sorted(v for v, _ in data) != network.inputs:
+        raise OperationFormatException('', '', 'Данные должны быть заданы для каждого входного слоя', kind='данных')
+    if sorted(v for v, _ in targets) != network.outputs:
+        raise OperationFormatException('', '', 'Ожидаемые значения должны быть заданы для каждого стока', kind='данных')
+
+    if args.resume:
+        load_checkpoint(args.checkpoint, network)
+    optimizer = Momentum(network, args.learning_rate, args.momentum, args.dtype)
+    with stage('train') as trained:
+        history = train(network, Dataset(data, targets), args.epochs, args.batch_size, optimizer, args.dtype,
+                        args.checkpoint)
+        trained.items = sum(epoch['samples'] for epoch in history)
+
+
+def serve_arguments(parser):
+    parser.add_argument('--graph', action='append', nargs=3, required=True, metavar=('NAME', 'INPUT', 'OPERATIONS'),
+                        help='Имя графа, файл графа и файл с описанием операций')
+    parser.add_argument('--socket', help='Путь к Unix-сокету')
+    parser.add_argument('--host', default='127.0.0.1', help='Адрес для TCP-подключений')
+    parser.add_argument('--port', type=int, help='Порт для TCP-подключений')
+
+
+def check_serve(parser, args):
+    if args.socket is None and args.port is None:
+        parser.error('нужно указать --socket или --port')
+
+
+def run_server(args, cache):
+    import asyncio
+
+    from graphnet.operations import load_network
+    from graphnet.server import Network, serve
+
+    networks = {}
+    for name, input_file, operations_file in args.graph:
+        plan = load_network(input_file, operations_file, cache)[2]
+        networks[name] = Network(name, plan)
+        logger.info('Граф %s загружен из %s', name, input_file)
+
+    try:
+        asyncio.run(serve(networks, args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+# name -> (help, adds the arguments, checks them or None, runs the command)
+COMMANDS = {
+    'to-xml': ('Преобразовать граф в XML', to_xml_arguments, None, to_xml),
+    'to-prefix': ('Вывести префиксные выражения стоков', to_prefix_arguments, None, to_prefix),
+    'eval': ('Вычислить значения стоков', eval_arguments, check_eval, evaluate_network),
+    'jobs': ('Выполнить задания из файла JSON lines', jobs_arguments, None, run_jobs),
+    'layers': ('Вычислить выходы сети слоев', layers_arguments, None, forward_layers),
+    'train': ('Обучить сеть слоев', train_arguments, check_train, train_network),
+    'serve': ('Запустить сервер вычислений', serve_arguments, check_serve, run_server),
+}
+
+
+def common_arguments(parser):
+    parser.add_argument('--no-cache', action='store_true', dest='no_cache', help='Не использовать кэш разобранных графов')
+    parser.add_argument('--log-file', help='Имя файла с логом программы', dest='log_file')
+    parser.add_argument('--log-level', help='Уровень логирования', dest='log_level', default='debug')
+    add_profile_arguments(parser)
+
+
+def configure_logging(args):
+    numeric_level = getattr(logging, args.log_level.upper(), None)
+    if not isinstance(numeric_level, int):
+        raise ValueError('Invalid log level: %s' % args.log_level)
+
+    logging.basicConfig(level=numeric_level, filename=args.log_file, encoding='utf-8')
+
+
+def error_message(e):
+    """Returns the message reported for an error of a command, None for an unexpected one."""
+    if isinstance(e, InputException):
+        return f'Ошибка в данных входного файла {e.input_file} в строке {e.line}'
+    if isinstance(e, DataException):
+        return f'Ошибка в логике данных входного файла {e.input_file} в строке {e.line}. Текст ошибки {e.message}'
+    if isinstance(e, CycleException):
+        return 'Существует цикл ' + ' -> '.join(str(v) for v in e.cycle + e.cycle[:1])
+    if isinstance(e, OperationFormatException):
+        # errors of the arguments as a whole have no file or line
+        where = (f' {e.input_file}' if e.input_file else '') + (f' в строке {e.line}' if e.line != '' else '')
+        return f'Ошибка в файле {e.kind}{where}. Текст ошибки {e.message}'
+    if isinstance(e, OverflowError):
+        return 'Переполнение при вычислении, используйте --numeric float или --numeric log'
+    if isinstance(e, ZeroDivisionError):
+        return 'Деление на ноль при вычислении, используйте --numeric float'
+
+    return None
+
+
+def run(command, args):
+    """Runs a command with parsed arguments, logging its errors instead of raising them."""
+    from graphnet.cache import GraphCache
+
+    with profiler_from_arguments(args):
+        try:
+            COMMANDS[command][3](args, None if args.no_cache else GraphCache())
+        except Exception as e:
+            message = error_message(e)
+            if message is not None:
+                logging.fatal(message)
+            else:
+                logging.fatal('Неизвестная ошибка')
+                logging.exception(e)
+
+
+def run_command(command, argv=None):
+    """Parses the arguments of a single command and runs it, as the task scripts and module mains do."""
+    parser = argparse.ArgumentParser()
+    _, add_arguments, check, _ = COMMANDS[command]
+    common_arguments(parser)
+    add_arguments(parser)
+
+    args = parser.parse_args(argv)
+    if check is not None:
+        check(parser, args)
+
+    configure_logging(args)
+    run(command, args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='graphnet')
+    commands = parser.add_subparsers(dest='command', required=True, metavar='COMMAND')
+    parsers = {}
+    for name, (description, add_arguments, _, _) in COMMANDS.items():
+        parsers[name] = commands.add_parser(name, help=description)
+        common_arguments(parsers[name])
+        add_arguments(parsers[name])
+
+    args = parser.parse_args(argv)
+    check = COMMANDS[args.command][2]
+    if check is not None:
+        check(parsers[args.command], args)
+
+    configure_logging(args)
+    run(args.command, args)
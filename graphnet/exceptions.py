@@ -0,0 +1,79 @@
+class InputException(Exception):
+    """Exception raised for errors in the input file.
+
+    Attributes:
+        input_file -- input file's name
+        line -- line that exception raised
+    """
+
+    def __init__(self, input_file, line):
+        self.input_file = input_file
+        self.line = line
+
+        super().__init__()
+
+
+class DataException(Exception):
+    """Exception raised for logic errors .
+
+    Attributes:
+        input_file -- input file's name
+        line -- line that exception raised
+        message -- explanation of the error
+    """
+
+    def __init__(self, input_file, line, message):
+        self.input_file = input_file
+        self.line = line
+        self.message = message
+
+        super().__init__(message)
+
+
+class CycleException(Exception):
+    """Exception raised when cycle found .
+
+    Attributes:
+        v -- first vertex
+        u -- second vertex
+        cycle -- vertices of the cycle in the order of its arcs
+    """
+
+    def __init__(self, v, u, cycle=None):
+        self.v = v
+        self.u = u
+        self.cycle = cycle if cycle is not None else [v, u]
+
+        super().__init__()
+
+
+class OperationFormatException(Exception):
+    """Exception raised due incorrect operation's format .
+
+    Attributes:
+        input_file -- input file's name
+        line -- line that exception raised
+        message -- explanation of the error
+        kind -- what the file describes, in the genitive: операций, слоев, данных or контрольной точки
+    """
+
+    def __init__(self, input_file, line, message, kind='операций'):
+        self.input_file = input_file
+        self.line = line
+        self.message = message
+        self.kind = kind
+
+        super().__init__(message)
+
+
+class RequestException(Exception):
+    """Exception raised for a malformed evaluation request .
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message):
+        self.message = message
+
+        super().__init__(message)
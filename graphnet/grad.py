@@ -0,0 +1,54 @@
+from graphnet.plan import execute, kernels
+
+
+def backward(plan, values, sink_slot, one=1):
+    """Runs the reverse sweep from one sink over the values of a forward run.
+
+    Returns the derivative of the sink with respect to every leaf it depends
+    on, keyed by leaf vertex. The sweep starts from one, whose type the
+    derivatives keep where the local derivatives are integers.
+    """
+    opcodes, arg_offsets, args = plan.opcodes, plan.arg_offsets, plan.args
+    derivative = kernels('derivative')
+    adjoint = [0] * (sink_slot + 1)
+    reached = bytearray(sink_slot + 1)
+    adjoint[sink_slot] = one
+    reached[sink_slot] = 1
+
+    for i in range(sink_slot, plan.leaves - 1, -1):
+        if not reached[i]:
+            continue
+
+        slots = args[arg_offsets[i]:arg_offsets[i + 1]]
+        local = derivative[opcodes[i]]([values[s] for s in slots], values[i])
+        for s, d in zip(slots, local):
+            adjoint[s] += adjoint[i] * d
+            reached[s] = 1
+
+    return {plan.vertices[i]: adjoint[i] for i in range(min(plan.leaves, sink_slot + 1)) if reached[i]}
+
+
+def gradients(plan, constants=None, forward=execute):
+    """Returns d(sink)/d(leaf) for every sink and every leaf it depends on.
+
+    One forward run of forward records the values of all slots, then one
+    reverse sweep per sink walks the arguments of the instructions back to
+    the leaves. The result maps each sink to a dict keyed by leaf vertex.
+    The derivatives are floats unless forward is the exact execute.
+    """
+    values = forward(plan, constants)
+    one = 1 if forward is execute else 1.0
+
+    return {v: backward(plan, values, s, one) for v, s in zip(plan.outputs, plan.output_slots)}
+
+
+def cone_leaves(plan, sink_slot):
+    """Returns the leaf vertices the sink in sink_slot depends on."""
+    reached = bytearray(sink_slot + 1)
+    reached[sink_slot] = 1
+    for i in range(sink_slot, plan.leaves - 1, -1):
+        if reached[i]:
+            for s in plan.args[plan.arg_offsets[i]:plan.arg_offsets[i + 1]]:
+                reached[s] = 1
+
+    return [plan.vertices[i] for i in range(min(plan.leaves, sink_slot + 1)) if reached[i]]
@@ -0,0 +1,94 @@
+from array import array
+
+
+def _offsets(size, keys):
+    offsets = array('l', [0]) * (size + 2)
+    for k in keys:
+        offsets[k + 1] += 1
+    for v in range(1, size + 2):
+        offsets[v] += offsets[v - 1]
+
+    return offsets
+
+
+def _place(offsets, keys, first, second, ranks=None):
+    placed_first = array('l', [0]) * len(keys)
+    placed_second = array('l', [0]) * len(keys)
+    cursor = array('l', offsets)
+
+    for i, k in enumerate(keys):
+        if ranks is None:
+            pos = cursor[k]
+            cursor[k] = pos + 1
+        else:
+            pos = offsets[k] + ranks[i] - 1
+        placed_first[pos] = first[i]
+        placed_second[pos] = second[i]
+
+    return placed_first, placed_second
+
+
+class Graph:
+    """Directed graph with ordered arcs in compressed sparse row form.
+
+    Vertices are numbered 1..size. The out-arcs of v occupy positions
+    offsets[v]..offsets[v + 1] - 1 of targets and orders, in the order they
+    were read. The in-arcs of v occupy in_offsets[v]..in_offsets[v + 1] - 1
+    of sources and in_orders, sorted by order. Adjacency is returned as
+    memoryview slices of these arrays, without copying.
+    """
+
+    def __init__(self, offsets, targets, orders, in_offsets, sources, in_orders):
+        self.size = len(offsets) - 2
+        self.offsets = offsets
+        self.targets = targets
+        self.orders = orders
+        self.in_offsets = in_offsets
+        self.sources = sources
+        self.in_orders = in_orders
+
+        self._targets = memoryview(targets)
+        self._orders = memoryview(orders)
+        self._sources = memoryview(sources)
+        self._in_orders = memoryview(in_orders)
+
+    @classmethod
+    def from_arcs(cls, tails, heads, orders, size=0):
+        if tails:
+            size = max(size, max(tails), max(heads))
+
+        offsets = _offsets(size, tails)
+        targets, out_orders = _place(offsets, tails, heads, orders)
+
+        in_offsets = _offsets(size, heads)
+        # orders of the in-arcs of a vertex are validated to be 1..k, so each
+        # in-arc goes straight to its sorted position
+        sources, in_orders = _place(in_offsets, heads, tails, orders, orders)
+
+        return cls(offsets, targets, out_orders, in_offsets, sources, in_orders)
+
+    def __len__(self):
+        return self.size
+
+    def arcs_count(self):
+        return len(self.targets)
+
+    def out_arcs(self, v):
+        lo, hi = self.offsets[v], self.offsets[v + 1]
+        return self._targets[lo:hi], self._orders[lo:hi]
+
+    def in_arcs(self, v):
+        lo, hi = self.in_offsets[v], self.in_offsets[v + 1]
+        return self._sources[lo:hi], self._in_orders[lo:hi]
+
+    def out_degree(self, v):
+        return self.offsets[v + 1] - self.offsets[v]
+
+    def in_degree(self, v):
+        return self.in_offsets[v + 1] - self.in_offsets[v]
+
+    def roots(self):
+        return [v for v in range(1, self.size + 1) if self.in_degree(v) == 0]
+
+    def sinks(self):
+        return [v for v in range(1, self.size + 1) if self.out_degree(v) == 0]
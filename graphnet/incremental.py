@@ -0,0 +1,97 @@
+import heapq
+from array import array
+
+from graphnet.exceptions import RequestException
+from graphnet.plan import execute, kernels
+
+
+class IncrementalEvaluator:
+    """Keeps the values of a plan and recomputes only what changed leaves reach.
+
+    Slots are numbered in topological order, so dirty slots are recomputed
+    smallest first from a heap. A slot whose value comes out unchanged does
+    not dirty its users.
+
+    Attributes:
+        plan -- compiled plan
+        values -- current value of every slot
+        leaves -- slot of every leaf vertex
+    """
+
+    def __init__(self, plan, constants=None):
+        self.plan = plan
+        self.values = execute(plan, constants)
+        self.leaves = {v: i for i, v in enumerate(plan.vertices[:plan.leaves])}
+        self._sinks = {s: v for v, s in zip(plan.outputs, plan.output_slots)}
+        self._scalar = kernels()
+
+        # instructions reading each slot, in compressed sparse row form
+        self._user_offsets = array('l', [0]) * (len(plan) + 1)
+        for s in plan.args:
+            self._user_offsets[s + 1] += 1
+        for i in range(len(plan)):
+            self._user_offsets[i + 1] += self._user_offsets[i]
+        self._users = array('l', [0]) * len(plan.args)
+        cursor = array('l', self._user_offsets)
+        for i in range(plan.leaves, len(plan)):
+            for k in range(plan.arg_offsets[i], plan.arg_offsets[i + 1]):
+                s = plan.args[k]
+                self._users[cursor[s]] = i
+                cursor[s] += 1
+
+    def sink_values(self):
+        return {v: self.values[s] for s, v in self._sinks.items()}
+
+    def update(self, changes):
+        """Sets new values of leaves and recomputes their ancestors.
+
+        changes maps leaf vertices to values. Returns the sinks whose values
+        changed, keyed by vertex, with their new values. The update is all
+        or nothing: when a leaf is unknown or a recomputed slot raises, the
+        values are restored to those before the call and the error is
+        raised.
+        """
+        values = self.values
+        dirty = []
+        queued = set()
+        changed = {}
+        # value of every slot written so far before this update
+        saved = {}
+
+        try:
+            for vertex, value in changes.items():
+                slot = self.leaves.get(vertex)
+                if slot is None:
+                    raise RequestException(f'Вершина \'{vertex}\' не является листом графа')
+                if values[slot] != value:
+                    saved.setdefault(slot, values[slot])
+                    values[slot] = value
+                    self._touch(slot, dirty, queued, changed)
+
+            while dirty:
+                i = heapq.heappop(dirty)
+                value = self._compute(i)
+                if value != values[i]:
+                    saved.setdefault(i, values[i])
+                    values[i] = value
+                    self._touch(i, dirty, queued, changed)
+        except Exception:
+            for slot, value in saved.items():
+                values[slot] = value
+            raise
+
+        return changed
+
+    def _touch(self, slot, dirty, queued, changed):
+        if slot in self._sinks:
+            changed[self._sinks[slot]] = self.values[slot]
+        for k in range(self._user_offsets[slot], self._user_offsets[slot + 1]):
+            user = self._users[k]
+            if user not in queued:
+                queued.add(user)
+                heapq.heappush(dirty, user)
+
+    def _compute(self, i):
+        plan = self.plan
+        arguments = [self.values[s] for s in plan.args[plan.arg_offsets[i]:plan.arg_offsets[i + 1]]]
+        return self._scalar[plan.opcodes[i]](arguments)
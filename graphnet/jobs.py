@@ -0,0 +1,171 @@
+import argparse
+import io
+import json
+import logging
+import sys
+import time
+from contextlib import redirect_stdout
+
+from graphnet.cache import MemoryCache
+from graphnet.cli import COMMANDS, error_message
+from graphnet.exceptions import RequestException
+
+logger = logging.getLogger(__name__)
+
+# commands a job may run
+MODES = ('to-xml', 'to-prefix', 'eval')
+
+# cache of the worker process, set by _start_worker
+_cache = None
+
+
+class _JobParser(argparse.ArgumentParser):
+    # the options of a job are checked by the parser of its command, an
+    # error becomes the error of the job instead of ending the program
+
+    def error(self, message):
+        raise RequestException(message)
+
+
+def job_arguments(job):
+    """Returns the arguments of the command of a job, as its parser would give them.
+
+    A job looks like {"id": 1, "mode": "eval", "input": "graph.txt",
+    "operations": "operations.txt", "output": "result.txt"}. mode is one of
+    to-xml, to-prefix and eval, the other fields are the options of that
+    command with '_' in place of '-', true for flags. Without output the
+    result is returned in the response, so format bin needs output.
+    """
+    if not isinstance(job, dict):
+        raise RequestException('Задание должно быть объектом')
+    mode = job.get('mode')
+    if mode not in MODES:
+        raise RequestException(f'Неизвестный режим \'{mode}\'')
+    if not isinstance(job.get('input'), str):
+        raise RequestException('Не задано поле input')
+
+    _, add_arguments, check, _ = COMMANDS[mode]
+    parser = _JobParser(prog=mode, add_help=False)
+    add_arguments(parser)
+
+    argv = []
+    for key, value in job.items():
+        if key in ('id', 'mode'):
+            continue
+        if value is True:
+            argv.append('--' + key.replace('_', '-'))
+        elif value is not False and value is not None:
+            argv += ['--' + key.replace('_', '-'), str(value)]
+
+    args = parser.parse_args(argv)
+    if check is not None:
+        check(parser, args)
+    if args.format == 'bin' and args.output is None:
+        # the response holds text only
+        raise RequestException('Для format bin нужно поле output')
+
+    return mode, args
+
+
+def run_job(line, cache):
+    """Runs one JSON job line and returns the response object.
+
+    The response carries the id of the job, its wall time in seconds and
+    either the output, when the job has no output file, or the error:
+    its message and the name of its exception type.
+    """
+    started = time.perf_counter()
+    response = {}
+    try:
+        try:
+            job = json.loads(line)
+        except ValueError:
+            raise RequestException('Задание не является JSON')
+        if isinstance(job, dict):
+            response['id'] = job.get('id')
+
+        mode, args = job_arguments(job)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            COMMANDS[mode][3](args, cache)
+        if args.output is None:
+            response['output'] = output.getvalue()
+    except RequestException as e:
+        response['error'] = e.message
+        response['error_type'] = type(e).__name__
+    except OSError as e:
+        # a missing or unreadable file fails the job, not the program
+        response['error'] = str(e)
+        response['error_type'] = type(e).__name__
+    except Exception as e:
+        message = error_message(e)
+        if message is None:
+            logger.exception(e)
+            message = f'Неизвестная ошибка: {e!r}'
+        response['error'] = message
+        response['error_type'] = type(e).__name__
+    response['seconds'] = time.perf_counter() - started
+
+    return response
+
+
+def _start_worker(directory, max_size, disk):
+    global _cache
+    _cache = MemoryCache(directory, max_size, disk=disk)
+
+
+def _run_in_worker(line):
+    return run_job(line, _cache)
+
+
+def _lines(jobs_file_name):
+    with open(jobs_file_name, 'r', encoding='utf-8') as jobs:
+        for number, line in enumerate(jobs, 1):
+            if line.strip():
+                yield number, line
+
+
+def run_jobs(jobs_file_name, out, cache=None, workers=1):
+    """Runs every job of a JSON lines file and writes a response line for each to out.
+
+    Parsed graphs and compiled plans are kept in memory by every process,
+    so jobs over the same files parse them once per process; with cache
+    they are also shared through its directory. With several workers the
+    responses come in the order the jobs finish, every response has the
+    number of its line in the jobs file. Returns the number of failed jobs.
+    """
+    disk = cache is not None
+    directory, max_size = (cache.directory, cache.max_size) if disk else (None, None)
+    failed = 0
+
+    def write(number, response):
+        nonlocal failed
+        failed += 'error' in response
+        response['line'] = number
+        out.write(json.dumps(response, ensure_ascii=False) + '\n')
+        out.flush()
+
+    if workers <= 1:
+        memory = MemoryCache(directory, max_size, disk=disk)
+        for number, line in _lines(jobs_file_name):
+            write(number, run_job(line, memory))
+        return failed
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(workers, initializer=_start_worker, initargs=(directory, max_size, disk)) as pool:
+        futures = {pool.submit(_run_in_worker, line): number for number, line in _lines(jobs_file_name)}
+        for future in as_completed(futures):
+            write(futures[future], future.result())
+
+    return failed
+
+
+def run_jobs_file(jobs_file_name, output_file_name=None, cache=None, workers=1):
+    if output_file_name is not None:
+        with open(output_file_name, 'w', encoding='utf-8') as out:
+            failed = run_jobs(jobs_file_name, out, cache, workers)
+    else:
+        failed = run_jobs(jobs_file_name, sys.stdout, cache, workers)
+
+    logger.info('Выполнено заданий с ошибками: %s', failed)
@@ -0,0 +1,229 @@
+import logging
+import os
+
+import numpy as np
+
+from graphnet.batch import CHUNK_ROWS
+from graphnet.cache import load_graph
+from graphnet.cli import run_command
+from graphnet.exceptions import OperationFormatException
+
+logger = logging.getLogger(__name__)
+
+ACTIVATIONS = {
+    'identity': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0, out=x),
+    'sigmoid': lambda x: np.reciprocal(np.add(np.exp(np.negative(x, out=x), out=x), 1, out=x), out=x),
+    'tanh': lambda x: np.tanh(x, out=x),
+    'exp': lambda x: np.exp(x, out=x),
+}
+
+
+class Layer:
+    """One vertex of a layer graph.
+
+    An input layer takes a matrix of samples. A dense layer multiplies the
+    concatenation of its arguments, in the order of the arcs, by weights,
+    adds bias and applies activation. + and * combine arguments of the same
+    size elementwise.
+
+    Attributes:
+        kind -- 'input', 'dense', '+' or '*'
+        size -- number of columns of the output
+        activation -- name of the activation of a dense layer
+        weights -- weight matrix of a dense layer, inputs by outputs
+        bias -- bias vector of a dense layer or None
+    """
+
+    def __init__(self, kind, size, activation='identity', weights=None, bias=None):
+        self.kind = kind
+        self.size = size
+        self.activation = activation
+        self.weights = weights
+        self.bias = bias
+
+
+def _load_array(file_name, base, input_file, line):
+    path = os.path.join(base, file_name)
+    try:
+        return np.load(path, mmap_mode='r')
+    except (OSError, ValueError):
+        raise OperationFormatException(input_file, line, f'Не удалось прочитать массив \'{file_name}\'', kind='слоев')
+
+
+def read_layers(graph, input_layers_file_name):
+    """Reads the layer of every vertex of graph.
+
+    Each line is 'vertex : description', where the description is one of
+    'input SIZE', 'dense ACTIVATION WEIGHTS [BIAS]', '+' or '*'. Weights and
+    bias are .npy files, relative to the directory of the layers file, and
+    are memory-mapped.
+    """
+    base = os.path.dirname(input_layers_file_name)
+    layers = {}
+
+    with open(input_layers_file_name, 'r') as input_layers:
+        for j, line in enumerate(input_layers, 1):
+            if not line.strip():
+                continue
+            vertex, sep, description = line.partition(':')
+            if not sep:
+                raise OperationFormatException(input_layers_file_name, j, 'Ошибка ввода слоя - не найден разделитель \':\'', kind='слоев')
+            try:
+                vertex = int(vertex)
+            except ValueError:
+                raise OperationFormatException(input_layers_file_name, j, f'Неверный номер вершины \'{vertex.strip()}\'', kind='слоев')
+            if not 1 <= vertex <= len(graph):
+                raise OperationFormatException(input_layers_file_name, j, f'Ошибка ввода слоя - в графе не существует такая вершина \'{vertex}\'', kind='слоев')
+
+            words = description.split()
+            kind = words[0] if words else ''
+            if kind == 'input' and len(words) == 2 and words[1].isdigit():
+                layers[vertex] = Layer(kind, int(words[1]))
+            elif kind == 'dense' and len(words) in (3, 4) and words[1] in ACTIVATIONS:
+                weights = _load_array(words[2], base, input_layers_file_name, j)
+                bias = _load_array(words[3], base, input_layers_file_name, j) if len(words) == 4 else None
+                if weights.ndim != 2 or bias is not None and bias.shape != weights.shape[1:]:
+                    raise OperationFormatException(input_layers_file_name, j, 'Неверная размерность весов слоя', kind='слоев')
+                layers[vertex] = Layer(kind, weights.shape[1], words[1], weights, bias)
+            elif kind in ('+', '*') and len(words) == 1:
+                layers[vertex] = Layer(kind, None)
+            else:
+                raise OperationFormatException(input_layers_file_name, j, f'Неверное описание слоя \'{description.strip()}\'', kind='слоев')
+
+    return layers
+
+
+def check_layers(graph, order, layers, input_layers_file_name):
+    """Checks that every vertex has a layer fitting its arguments.
+
+    Goes in topological order and fills in the size of the + and * layers.
+    """
+    for v in order:
+        layer = layers.get(v)
+        if layer is None:
+            raise OperationFormatException(input_layers_file_name, '', f'Не задан слой для вершины \'{v}\'', kind='слоев')
+
+        sizes = [layers[u].size for u in graph.in_arcs(v)[0]]
+        if layer.kind == 'input':
+            fits = not sizes
+        elif layer.kind == 'dense':
+            fits = sizes and sum(sizes) == layer.weights.shape[0]
+        else:
+            fits = len(sizes) > 1 and len(set(sizes)) == 1
+            layer.size = sizes[0] if fits else None
+        if not fits:
+            raise OperationFormatException(input_layers_file_name, '', f'Слой вершины \'{v}\' не соответствует его аргументам', kind='слоев')
+
+
+class LayerNetwork:
+    """Layer graph ready for the forward pass.
+
+    Attributes:
+        graph -- graph of the layers
+        order -- topological order of graph
+        layers -- layer of every vertex
+        inputs -- input layers, in ascending order
+        outputs -- sink layers, in ascending order
+    """
+
+    def __init__(self, graph, order, layers):
+        self.graph = graph
+        self.order = order
+        self.layers = layers
+        self.inputs = [v for v in range(1, len(graph) + 1) if layers[v].kind == 'input']
+        self.outputs = graph.sinks()
+
+    def activations(self, inputs, dtype=np.float64):
+        """Runs the network over one batch and returns the output of every layer keyed by vertex.
+
+        inputs maps every input layer to a matrix with a row per sample.
+        """
+        graph, layers = self.graph, self.layers
+        values = {}
+
+        for v in self.order:
+            layer = layers[v]
+            arguments = [values[u] for u in graph.in_arcs(v)[0]]
+            if layer.kind == 'input':
+                value = np.asarray(inputs[v], dtype=dtype)
+            elif layer.kind == 'dense':
+                x = arguments[0] if len(arguments) == 1 else np.concatenate(arguments, axis=1)
+                value = np.matmul(x, layer.weights.astype(dtype, copy=False))
+                if layer.bias is not None:
+                    value += layer.bias
+                with np.errstate(over='ignore'):
+                    value = ACTIVATIONS[layer.activation](value)
+            elif layer.kind == '+':
+                value = arguments[0] + arguments[1]
+                for x in arguments[2:]:
+                    value += x
+            else:
+                value = arguments[0] * arguments[1]
+                for x in arguments[2:]:
+                    value *= x
+            values[v] = value
+
+        return values
+
+    def forward(self, inputs, dtype=np.float64):
+        """Runs the network over one batch and returns the output of every sink layer keyed by vertex."""
+        values = self.activations(inputs, dtype)
+
+        return {v: values[v] for v in self.outputs}
+
+    def forward_batches(self, inputs, chunk_rows=CHUNK_ROWS, dtype=np.float64):
+        """Runs forward over blocks of chunk_rows rows, yields the results of the blocks."""
+        rows = len(next(iter(inputs.values())))
+        for lo in range(0, rows, chunk_rows):
+            yield self.forward({v: x[lo:lo + chunk_rows] for v, x in inputs.items()}, dtype)
+
+
+def load_layer_network(input_file_name, input_layers_file_name, cache=None):
+    """Reads the layer graph and its layers, checks them and returns a LayerNetwork.
+
+    The graph goes through the same reader, cache and topological sort as
+    scalar graphs, so a cycle of layers raises CycleException.
+    """
+    graph, order = load_graph(input_file_name, cache)
+    layers = read_layers(graph, input_layers_file_name)
+    check_layers(graph, order, layers, input_layers_file_name)
+
+    return LayerNetwork(graph, order, layers)
+
+
+def read_inputs(network, data):
+    """Loads the matrix of every input layer, data is a list of (vertex, file name) pairs."""
+    inputs = {}
+    for vertex, file_name in data:
+        if not vertex.isdigit() or int(vertex) not in network.inputs:
+            raise OperationFormatException(file_name, '', f'Вершина \'{vertex}\' не является входным слоем', kind='данных')
+        if file_name.endswith('.npy'):
+            matrix = np.load(file_name, mmap_mode='r')
+        else:
+            matrix = np.loadtxt(file_name, delimiter=',', ndmin=2)
+        if matrix.ndim != 2 or matrix.shape[1] != network.layers[int(vertex)].size:
+            raise OperationFormatException(file_name, '', f'Ожидалось столбцов: {network.layers[int(vertex)].size}', kind='данных')
+        inputs[int(vertex)] = matrix
+
+    missing = [v for v in network.inputs if v not in inputs]
+    if missing:
+        raise OperationFormatException('', '', f'Не заданы данные для входных слоев {missing}', kind='данных')
+    if len({len(x) for x in inputs.values()}) > 1:
+        raise OperationFormatException('', '', 'Количество строк во входных данных различается', kind='данных')
+
+    return inputs
+
+
+def write_outputs(out, network, blocks):
+    out.write(','.join(f'{v}:{k}' for v in network.outputs for k in range(network.layers[v].size)) + '\n')
+    for block in blocks:
+        np.savetxt(out, np.concatenate([block[v] for v in network.outputs], axis=1), delimiter=',', fmt='%.17g')
+
+
+def main():
+    run_command('layers')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+import math
+import sys
+
+from graphnet.ops import ADD, BY_CODE, EXP, MUL
+from graphnet.plan import depths, execute, kernels
+
+
+def _exp(x):
+    try:
+        return math.exp(x)
+    except OverflowError:
+        return math.inf
+
+
+def _float(x):
+    try:
+        return float(x)
+    except OverflowError:
+        return math.inf if x > 0 else -math.inf
+
+
+def execute_float(plan, constants=None):
+    """Runs plan over floats, a result out of range becomes inf instead of an error."""
+    if constants is None:
+        constants = plan.constants
+    values = [_float(c) for c in constants] + [None] * (len(plan) - plan.leaves)
+    get = values.__getitem__
+    opcodes, arg_offsets, args = plan.opcodes, plan.arg_offsets, memoryview(plan.args)
+    floating = kernels('floating')
+
+    for i in range(plan.leaves, len(plan)):
+        values[i] = floating[opcodes[i]](list(map(get, args[arg_offsets[i]:arg_offsets[i + 1]])))
+
+    return values
+
+
+class LogNumber:
+    """Real number kept as its sign and the logarithm of its absolute value.
+
+    Products and exponents of numbers far beyond the float range stay finite
+    in this form, only exp of such a number overflows. While a number fits
+    in a float it is kept as that float too, and the kernels compute over
+    the floats, so results in the float range are the same as with floats.
+
+    Attributes:
+        sign -- -1, 0 or 1
+        log -- natural logarithm of the absolute value, -inf for zero
+        value -- the number as a float, None when it is out of the float range
+    """
+
+    __slots__ = ('sign', 'log', 'value')
+
+    def __init__(self, sign, log, value=None):
+        self.sign = sign
+        self.log = log
+        self.value = value
+
+    @classmethod
+    def of(cls, x):
+        if x == 0:
+            return ZERO
+        if x != x:
+            return cls(1, math.nan, math.nan)
+        value = _float(x)
+        return cls(1 if x > 0 else -1, math.log(abs(x)), value if math.isfinite(value) else None)
+
+    @classmethod
+    def from_log(cls, sign, log):
+        # a result of log-space arithmetic, its float is only as exact as the logarithm
+        value = sign * math.exp(log) if log < _MAX_LOG else None
+        return cls(sign, log, value)
+
+    def __float__(self):
+        if self.value is not None:
+            return self.value
+        return self.sign * _exp(self.log) if self.sign else 0.0
+
+    def __eq__(self, other):
+        return isinstance(other, LogNumber) and self.sign == other.sign and self.log == other.log
+
+    def __repr__(self):
+        return f'LogNumber({self.sign}, {self.log!r})'
+
+    def __str__(self):
+        if self.value is not None:
+            return str(self.value)
+        if self.log != self.log or self.log == math.inf:
+            return str(self.sign * self.log)
+
+        sign = '-' if self.sign < 0 else ''
+        exponent, mantissa = divmod(self.log / math.log(10), 1)
+        if exponent > 2 ** 53:
+            # the logarithm has no digits of the mantissa left
+            return f'{sign}exp({self.log!r})'
+
+        # scientific notation with the exponent computed from the logarithm
+        return f'{sign}{10 ** mantissa!r}e+{int(exponent)}'
+
+
+ZERO = LogNumber(0, -math.inf, 0.0)
+
+# logarithm of the largest float
+_MAX_LOG = math.log(sys.float_info.max)
+
+
+def _in_floats(arguments, kernel):
+    # the kernel over the floats of the arguments, None when one of them or
+    # the result is out of the float range
+    values = [x.value for x in arguments]
+    if None in values:
+        return None
+    result = kernel(values)
+    return LogNumber.of(result) if not math.isinf(result) else None
+
+
+def log_add(arguments):
+    result = _in_floats(arguments, sum)
+    if result is not None:
+        return result
+
+    arguments = [x for x in arguments if x.sign]
+    if not arguments:
+        return ZERO
+
+    top = max(x.log for x in arguments)
+    if top == math.inf:
+        return LogNumber.of(sum(x.sign * math.inf for x in arguments if x.log == math.inf))
+
+    total = sum(x.sign * math.exp(x.log - top) for x in arguments)
+    if not total:
+        return ZERO
+
+    return LogNumber.from_log(1 if total > 0 else -1, top + math.log(abs(total)))
+
+
+def log_mul(arguments):
+    result = _in_floats(arguments, math.prod)
+    if result is not None:
+        return result
+
+    sign, log = 1, 0.0
+    for x in arguments:
+        if not x.sign:
+            return ZERO
+        sign *= x.sign
+        log += x.log
+
+    return LogNumber.from_log(sign, log)
+
+
+def log_exp(arguments):
+    result = _in_floats(arguments, lambda values: _exp(values[0]))
+    if result is not None:
+        return result
+
+    value = float(arguments[0])
+    if value == -math.inf:
+        return ZERO
+
+    return LogNumber(1, value)
+
+
+LOG_KERNELS = {ADD: log_add, MUL: log_mul, EXP: log_exp}
+
+
+def execute_log(plan, constants=None):
+    """Runs plan over LogNumber values.
+
+    The range grows from about 1e308 to about exp(1e308), so one more level
+    of exp fits than with floats. Operations other than +, * and exp are
+    computed over floats.
+    """
+    if constants is None:
+        constants = plan.constants
+    values = [LogNumber.of(c) for c in constants] + [None] * (len(plan) - plan.leaves)
+    get = values.__getitem__
+    opcodes, arg_offsets, args = plan.opcodes, plan.arg_offsets, memoryview(plan.args)
+    floating = kernels('floating')
+
+    for i in range(plan.leaves, len(plan)):
+        arguments = list(map(get, args[arg_offsets[i]:arg_offsets[i + 1]]))
+        op = opcodes[i]
+        if op in LOG_KERNELS:
+            values[i] = LOG_KERNELS[op](arguments)
+        else:
+            # operations without a log-space kernel go through floats
+            values[i] = LogNumber.of(floating[op]([float(x) for x in arguments]))
+
+    return values
+
+
+def _levels(plan):
+    # groups the instructions by their depth and opcode, instructions of one
+    # group depend only on lower levels and run as one NumPy operation
+    level = depths(plan)
+    groups = {}
+    for i in range(plan.leaves, len(plan)):
+        groups.setdefault((level[i], plan.opcodes[i]), []).append(i)
+
+    return [(op, group) for (_, op), group in sorted(groups.items())]
+
+
+def execute_float32(plan, constants=None):
+    """Runs plan over a NumPy float32 array, one operation per level and opcode.
+
+    Operations with a NumPy ufunc to fold their arguments, such as sums and
+    products, run it with reduceat over the gathered arguments, the rest
+    call their vector kernel with one array per argument position. Overflow
+    gives inf, as with execute_float.
+    """
+    import numpy as np
+
+    if constants is None:
+        constants = plan.constants
+    values = np.empty(len(plan), dtype=np.float32)
+    args = np.frombuffer(plan.args, dtype=np.dtype(plan.args.typecode))
+    arg_offsets = np.frombuffer(plan.arg_offsets, dtype=np.dtype(plan.arg_offsets.typecode))
+
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        values[:plan.leaves] = [_float(c) for c in constants]
+        for op, group in _levels(plan):
+            group = np.array(group)
+            starts = arg_offsets[group]
+            lengths = arg_offsets[group + 1] - starts
+            if BY_CODE[op].reduce is not None:
+                gathered = values[args[np.repeat(starts, lengths) + _ranges(lengths)]]
+                positions = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+                values[group] = getattr(np, BY_CODE[op].reduce).reduceat(gathered, positions)
+            else:
+                # operations without a ufunc have a fixed number of arguments
+                values[group] = BY_CODE[op].vector([values[args[starts + k]] for k in range(lengths[0])])
+
+    return values.tolist()
+
+
+def _ranges(lengths):
+    # 0, 1, ..., n - 1 for every n of lengths, concatenated
+    import numpy as np
+
+    ends = np.cumsum(lengths)
+    return np.arange(ends[-1]) - np.repeat(ends - lengths, lengths)
+
+
+BACKENDS = {
+    'exact': execute,
+    'float': execute_float,
+    'log': execute_log,
+    'float32': execute_float32,
+}
+
+
+def evaluate(plan, backend='exact', constants=None):
+    """Runs plan with the named backend and returns the sink values keyed by vertex.
+
+    exact computes with Python numbers and raises OverflowError when exp
+    goes out of the float range, float and float32 give inf instead, log
+    returns LogNumber values.
+    """
+    values = BACKENDS[backend](plan, constants)
+
+    return {v: values[s] for v, s in zip(plan.outputs, plan.output_slots)}
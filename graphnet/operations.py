@@ -0,0 +1,89 @@
+from graphnet.binary import is_binary, read_binary
+from graphnet.cache import load_graph
+from graphnet.exceptions import OperationFormatException
+from graphnet.ops import OPERATIONS
+from graphnet.plan import compile_plan, plan_operations
+from graphnet.profiling import stage
+
+
+def operations_reading_in_format(graph, input_operation_filename):
+    operations = {}
+    j = 0
+    with open(input_operation_filename, 'r') as input_operations:
+        for line in input_operations:
+            line = line[:(len(line) - 1)]
+            line = line.replace(' ', '')
+            pos = line.find(':')
+            if pos == -1:
+                raise OperationFormatException(input_operation_filename, j + 1, 'Ошибка ввода операции - не найден разделитель \':\'')
+
+            vertex = int(line[:pos])
+            if not 1 <= vertex <= len(graph):
+                raise OperationFormatException(input_operation_filename, j + 1, f'Ошибка ввода операции - в графе не существует такая вершина \'{vertex}\'')
+
+            operation = str(line[(pos + 1):])
+            try:
+                if operation not in OPERATIONS:
+                    operations[str(vertex)] = int(operation)
+                else:
+                    operations[str(vertex)] = operation
+            except:
+                raise OperationFormatException(input_operation_filename, j + 1, f'Ошибка ввода операции \'{operation}\' - неверный формат числа или символа операции. Проверьте что что строка не пустая и содержит корректные символы')
+            j += 1
+
+    return operations
+
+
+def check_operation_correctness(graph, operations, input_operation_file_name):
+    for vertex in range(1, len(graph) + 1):
+        if str(vertex) not in operations:
+            raise OperationFormatException(input_operation_file_name, '', f'Не задана операция для вершины \'{vertex}\'')
+        if type(operations[str(vertex)]) == int:
+            if graph.in_degree(vertex) == 0:
+                continue
+            raise OperationFormatException(input_operation_file_name, '', f'Операция \'{operations[str(vertex)]}\' не соответствует вершине \'{vertex}\'')
+        elif OPERATIONS[operations[str(vertex)]].accepts(graph.in_degree(vertex)):
+            continue
+        raise OperationFormatException(input_operation_file_name, '', f'Операция \'{operations[str(vertex)]}\' не соответствует вершине \'{vertex}\'')
+
+
+def load_network(input_file_name, input_operation_file_name=None, cache=None):
+    """Loads a graph with its operations and compiles it.
+
+    Operations come from input_operation_file_name, or from the graph file
+    itself when it is binary and no operations file is given. Returns
+    (graph, order, plan, operations), the plan is taken from cache when
+    possible.
+    """
+    graph, order = load_graph(input_file_name, cache)
+
+    if cache is not None:
+        with stage('cache lookup plan') as lookup:
+            plan_key = cache.key(*[f for f in (input_file_name, input_operation_file_name) if f is not None])
+            plan = cache.load_plan(plan_key)
+            lookup.items = int(plan is not None)
+        if plan is not None:
+            return graph, order, plan, plan_operations(plan)
+
+    with stage('read operations') as read:
+        if input_operation_file_name is not None:
+            operations = operations_reading_in_format(graph, input_operation_file_name)
+        elif is_binary(input_file_name):
+            operations = read_binary(input_file_name)[2]
+        else:
+            operations = None
+        if operations is None:
+            raise OperationFormatException(input_file_name, '', 'Не задан файл с описанием операций')
+        read.items = len(operations)
+
+    with stage('check operations'):
+        check_operation_correctness(graph, operations, input_operation_file_name or input_file_name)
+
+    with stage('compile plan') as compiled:
+        plan = compile_plan(graph, order, operations)
+        compiled.items = len(plan)
+    if cache is not None:
+        with stage('cache store plan'):
+            cache.store_plan(plan_key, plan)
+
+    return graph, order, plan, operations
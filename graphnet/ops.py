@@ -0,0 +1,196 @@
+import math
+
+CONST = 0
+ADD = 1
+MUL = 2
+EXP = 3
+SIGMOID = 4
+TANH = 5
+RELU = 6
+MAX = 7
+DIV = 8
+
+# name of every registered operation by code and back, filled by register
+OPCODES = {}
+NAMES = {}
+OPERATIONS = {}
+# operation of every code, indexed by opcode in the evaluation loops
+BY_CODE = [None] * 128
+
+
+class Operation:
+    """Vertex operation of the computation graph.
+
+    The kernels take the list of argument values in the order of the arcs.
+    scalar works on Python numbers and may raise OverflowError or
+    ZeroDivisionError, floating works on floats and follows IEEE 754
+    instead, vector works on NumPy arrays of the same shape. derivative
+    returns the partial derivatives with respect to every argument, given
+    the arguments and the value of the operation, for numbers and for
+    arrays alike.
+
+    Attributes:
+        name -- name in the operations file
+        code -- opcode in plans and binary files
+        min_arity -- least number of arguments
+        max_arity -- largest number of arguments, None for no limit
+        scalar -- kernel over Python numbers
+        vector -- kernel over NumPy arrays
+        derivative -- partial derivatives of the operation
+        floating -- kernel over floats, scalar when not given
+        reduce -- name of the NumPy ufunc folding the arguments, if any
+    """
+
+    def __init__(self, name, code, min_arity, max_arity, scalar, vector, derivative, floating=None, reduce=None):
+        self.name = name
+        self.code = code
+        self.min_arity = min_arity
+        self.max_arity = max_arity
+        self.scalar = scalar
+        self.vector = vector
+        self.derivative = derivative
+        self.floating = floating or scalar
+        self.reduce = reduce
+
+    def accepts(self, arity):
+        return self.min_arity <= arity and (self.max_arity is None or arity <= self.max_arity)
+
+    def benchmark(self, number=100000, size=1 << 16, seed=0):
+        """Times the kernels on random arguments in (0.1, 1) of the least arity.
+
+        Returns nanoseconds per scalar call and per vector element.
+        """
+        import random
+        import timeit
+
+        import numpy as np
+
+        rnd = random.Random(seed)
+        arity = max(self.min_arity, 2) if self.max_arity is None else self.min_arity
+        scalar_arguments = [rnd.uniform(0.1, 1) for _ in range(arity)]
+        vector_arguments = [np.random.default_rng(seed + k).uniform(0.1, 1, size) for k in range(arity)]
+
+        scalar = min(timeit.repeat(lambda: self.scalar(scalar_arguments), number=number, repeat=3)) / number
+        vector = min(timeit.repeat(lambda: self.vector(vector_arguments), number=10, repeat=3)) / 10 / size
+
+        return {'operation': self.name, 'arity': arity, 'scalar_ns': scalar * 1e9, 'vector_ns_per_element': vector * 1e9}
+
+
+def register(operation):
+    if operation.name in OPERATIONS or BY_CODE[operation.code] is not None or operation.code == CONST:
+        raise ValueError(f'operation {operation.name!r} or code {operation.code} is already registered')
+
+    OPERATIONS[operation.name] = operation
+    OPCODES[operation.name] = operation.code
+    NAMES[operation.code] = operation.name
+    BY_CODE[operation.code] = operation
+
+    return operation
+
+
+def _np():
+    import numpy
+    return numpy
+
+
+def _exp(arguments):
+    return math.exp(arguments[0])
+
+
+def _float_exp(arguments):
+    try:
+        return math.exp(arguments[0])
+    except OverflowError:
+        return math.inf
+
+
+def _sum_arrays(arrays):
+    value = arrays[0] + arrays[1]
+    for x in arrays[2:]:
+        value += x
+    return value
+
+
+def _prod_arrays(arrays):
+    value = arrays[0] * arrays[1]
+    for x in arrays[2:]:
+        value *= x
+    return value
+
+
+def _others_products(arguments, value=None):
+    # product of all arguments but the k-th for every k, without division so
+    # that zero arguments work
+    prefix = [1]
+    for x in arguments[:-1]:
+        prefix.append(prefix[-1] * x)
+    suffix = 1
+    products = [None] * len(arguments)
+    for k in range(len(arguments) - 1, -1, -1):
+        products[k] = prefix[k] * suffix
+        suffix *= arguments[k]
+
+    return products
+
+
+def _sigmoid(arguments):
+    x = arguments[0]
+    if x >= 0:
+        return 1 / (1 + math.exp(-x))
+    e = math.exp(x)
+    return e / (1 + e)
+
+
+def _max_derivative(arguments, value):
+    # the first of equal maxima takes the whole derivative
+    if not hasattr(value, 'shape'):
+        first = arguments.index(value)
+        return [1 if k == first else 0 for k in range(len(arguments))]
+
+    np = _np()
+    taken = np.zeros(value.shape, dtype=bool)
+    partials = []
+    for x in arguments:
+        hit = (x == value) & ~taken
+        taken |= hit
+        partials.append(hit.astype(value.dtype))
+    return partials
+
+
+def _div(arguments):
+    return arguments[0] / arguments[1]
+
+
+def _float_div(arguments):
+    a, b = arguments
+    try:
+        return a / b
+    except ZeroDivisionError:
+        return math.copysign(math.inf, a) * math.copysign(1, b) if a else math.nan
+
+
+def _div_derivative(arguments, value):
+    a, b = arguments
+    return [1 / b, -a / (b * b)]
+
+
+def _relu_derivative(arguments, value):
+    x = arguments[0]
+    return [(x > 0) * 1]
+
+
+register(Operation('+', ADD, 2, None, sum, _sum_arrays, lambda arguments, value: [1] * len(arguments),
+                   reduce='add'))
+register(Operation('*', MUL, 2, None, math.prod, _prod_arrays, _others_products, reduce='multiply'))
+register(Operation('exp', EXP, 1, 1, _exp, lambda arrays: _np().exp(arrays[0]), lambda arguments, value: [value],
+                   floating=_float_exp))
+register(Operation('sigmoid', SIGMOID, 1, 1, _sigmoid, lambda arrays: 0.5 * (1 + _np().tanh(0.5 * arrays[0])),
+                   lambda arguments, value: [value * (1 - value)]))
+register(Operation('tanh', TANH, 1, 1, lambda arguments: math.tanh(arguments[0]),
+                   lambda arrays: _np().tanh(arrays[0]), lambda arguments, value: [1 - value * value]))
+register(Operation('relu', RELU, 1, 1, lambda arguments: max(arguments[0], 0),
+                   lambda arrays: _np().maximum(arrays[0], 0), _relu_derivative))
+register(Operation('max', MAX, 2, None, max, lambda arrays: _np().maximum.reduce(arrays), _max_derivative,
+                   reduce='maximum'))
+register(Operation('div', DIV, 2, 2, _div, lambda arrays: _np().divide(arrays[0], arrays[1]), _div_derivative,
+                   floating=_float_div))
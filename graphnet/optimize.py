@@ -0,0 +1,136 @@
+import math
+from array import array
+
+from graphnet.graph import Graph
+from graphnet.ops import OPERATIONS
+
+# value of a vertex that is not known before evaluation
+_UNKNOWN = object()
+
+
+class Reduction:
+    """Graph left by optimize with the map back to the original vertices.
+
+    Attributes:
+        graph -- reduced graph, vertices numbered from 1 in topological order
+        order -- topological order of graph
+        operations -- operation of every vertex of graph, keyed by str(vertex)
+        originals -- original vertex of every vertex of graph, the first one of those merged into it,
+                     originals[0] is unused
+        representative -- vertex of graph computing every original vertex, 0 for a removed one
+        outputs -- vertex of graph computing every original sink, in ascending order of the sinks
+        merged -- number of vertices merged into an identical one
+        folded -- number of inner vertices replaced by their constant value
+    """
+
+    def __init__(self, graph, order, operations, originals, representative, outputs, merged, folded):
+        self.graph = graph
+        self.order = order
+        self.operations = operations
+        self.originals = originals
+        self.representative = representative
+        self.outputs = outputs
+        self.merged = merged
+        self.folded = folded
+
+    @property
+    def removed(self):
+        return len(self.representative) - 1 - len(self.graph)
+
+
+def optimize(graph, order, operations, fold=False, kernel='scalar'):
+    """Merges structurally identical vertices of a checked graph and returns a Reduction.
+
+    Vertices are hash-consed by their operation and the ordered list of
+    their arguments, so a vertex with the same operation over the same
+    vertices as an earlier one is replaced by it. Leaves stay distinct
+    inputs unless fold is set.
+
+    With fold the leaves are taken as constants: leaves of equal value are
+    merged and every inner vertex over constants only is computed with the
+    given kernel of its operation and becomes a leaf. A vertex whose value
+    overflows, divides by zero or is not a finite float is left to the
+    evaluation, whose backend may have a wider range. Vertices no sink
+    depends on any more are dropped.
+    """
+    compute = {name: getattr(op, kernel) for name, op in OPERATIONS.items()}
+    in_offsets, sources = graph.in_offsets, memoryview(graph.sources)
+    representative = array('l', [0]) * (len(graph) + 1)
+    get = representative.__getitem__
+    table = {}
+    # the vertices kept, numbered in the order they are met, with their
+    # operation, arguments and value
+    kept = [0]
+    kept_operations = [None]
+    kept_args = [()]
+    values = [_UNKNOWN]
+    merged = folded = 0
+
+    for v in order:
+        operation = operations[str(v)]
+        args = tuple(map(get, sources[in_offsets[v]:in_offsets[v + 1]]))
+
+        if not args:
+            key = (type(operation), operation) if fold else v
+            value = operation if fold else _UNKNOWN
+        else:
+            key, value = (operation, args), _UNKNOWN
+            if fold and all(values[a] is not _UNKNOWN for a in args):
+                try:
+                    value = compute[operation]([values[a] for a in args])
+                except (OverflowError, ZeroDivisionError, ValueError):
+                    value = _UNKNOWN
+                if isinstance(value, float) and not math.isfinite(value):
+                    # inf or nan of a float kernel, the backend may go further
+                    value = _UNKNOWN
+                if value is not _UNKNOWN:
+                    operation, args, key = value, (), (type(value), value)
+                    folded += 1
+
+        if key in table:
+            representative[v] = table[key]
+            merged += 1
+            continue
+
+        table[key] = representative[v] = len(kept)
+        kept.append(v)
+        kept_operations.append(operation)
+        kept_args.append(args)
+        values.append(value)
+
+    sinks = graph.sinks()
+
+    # folding leaves the arguments of a folded vertex without users, only
+    # what the sinks depend on is kept
+    live = bytearray(len(kept))
+    for v in sinks:
+        live[representative[v]] = 1
+    for w in range(len(kept) - 1, 0, -1):
+        if live[w]:
+            for a in kept_args[w]:
+                live[a] = 1
+
+    renumber = array('l', [0]) * len(kept)
+    originals = array('l', [0])
+    reduced_operations = {}
+    tails, heads, orders = array('l'), array('l'), array('l')
+    for w in range(1, len(kept)):
+        if not live[w]:
+            continue
+        renumber[w] = len(originals)
+        originals.append(kept[w])
+        reduced_operations[str(renumber[w])] = kept_operations[w]
+        for k, a in enumerate(kept_args[w], 1):
+            tails.append(renumber[a])
+            heads.append(renumber[w])
+            orders.append(k)
+
+    for v in range(1, len(graph) + 1):
+        representative[v] = renumber[representative[v]]
+
+    reduced = Graph.from_arcs(tails, heads, orders, len(originals) - 1)
+    # the vertices were numbered in topological order
+    reduced_order = array('l', range(1, len(reduced) + 1))
+    outputs = array('l', [representative[v] for v in sinks])
+
+    return Reduction(reduced, reduced_order, reduced_operations, originals, representative, outputs, merged, folded)
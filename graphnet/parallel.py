@@ -0,0 +1,112 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+from graphnet.plan import depths, kernels
+
+# instructions of a level per worker below which the level is not sent to the pool
+MIN_SHARE = 256
+
+# plan arrays and kernels of a worker process, set by _attach
+_shared = None
+
+
+class SharedPlan:
+    """Instruction arrays of a plan copied into shared memory blocks.
+
+    Worker processes attach to the blocks by name instead of receiving a
+    pickled copy of the plan.
+
+    Attributes:
+        blocks -- shared memory blocks of arg_offsets, args and opcodes
+    """
+
+    def __init__(self, plan):
+        self.blocks = []
+        try:
+            for column in (plan.arg_offsets, plan.args, plan.opcodes):
+                data = column.tobytes()
+                block = SharedMemory(create=True, size=max(len(data), 1))
+                self.blocks.append(block)
+                block.buf[:len(data)] = data
+        except BaseException:
+            self.close()
+            raise
+
+        self.layout = [(block.name, column.typecode, len(column))
+                       for block, column in zip(self.blocks, (plan.arg_offsets, plan.args, plan.opcodes))]
+
+    def close(self):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+def _attach(layout):
+    global _shared
+
+    blocks = [SharedMemory(name=name) for name, _, _ in layout]
+    views = [block.buf[:length * array(typecode).itemsize].cast(typecode)
+             for block, (_, typecode, length) in zip(blocks, layout)]
+    _shared = blocks, views, kernels()
+
+
+def _evaluate_slots(slots, known):
+    # known holds the value of every argument of slots
+    _, (arg_offsets, args, opcodes), scalar = _shared
+
+    get = known.__getitem__
+
+    return [scalar[opcodes[i]](list(map(get, args[arg_offsets[i]:arg_offsets[i + 1]]))) for i in slots]
+
+
+def _level_sets(plan):
+    # instructions of every depth above the leaves, each reads lower depths only
+    sets = []
+    for i, d in enumerate(depths(plan)[plan.leaves:], plan.leaves):
+        if d > len(sets):
+            sets.append(array('l'))
+        sets[d - 1].append(i)
+
+    return sets
+
+
+def evaluate_parallel(plan, workers, constants=None):
+    """Evaluates plan level by level in a process pool.
+
+    The instructions of one depth depend only on lower depths, so every
+    level is cut into one contiguous share per worker, which gets the
+    values of the arguments of its share with it. Every instruction is
+    computed once. Levels with fewer than MIN_SHARE instructions per worker
+    run in the calling process, sending them would cost more than computing
+    them. Returns the values of the sinks keyed by vertex, like evaluate.
+    """
+    if constants is None:
+        constants = plan.constants
+    values = constants + [None] * (len(plan) - plan.leaves)
+    get = values.__getitem__
+    arg_offsets, args, opcodes = plan.arg_offsets, memoryview(plan.args), plan.opcodes
+    scalar = kernels()
+
+    shared = SharedPlan(plan)
+    try:
+        # the pool starts its processes only when a level is first sent to it
+        with ProcessPoolExecutor(workers, initializer=_attach, initargs=(shared.layout,)) as pool:
+            for level in _level_sets(plan):
+                if len(level) < workers * MIN_SHARE:
+                    for i in level:
+                        values[i] = scalar[opcodes[i]](list(map(get, args[arg_offsets[i]:arg_offsets[i + 1]])))
+                    continue
+
+                size = -(-len(level) // workers)
+                shares = [level[k:k + size] for k in range(0, len(level), size)]
+                known = [{s: values[s] for i in share for s in args[arg_offsets[i]:arg_offsets[i + 1]]}
+                         for share in shares]
+                for share, results in zip(shares, pool.map(_evaluate_slots, shares, known)):
+                    for i, value in zip(share, results):
+                        values[i] = value
+    finally:
+        shared.close()
+
+    return {v: values[s] for v, s in zip(plan.outputs, plan.output_slots)}
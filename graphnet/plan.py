@@ -0,0 +1,120 @@
+from array import array
+
+from graphnet.ops import BY_CODE, CONST, NAMES, OPCODES
+
+
+class Plan:
+    """Computation graph compiled into a flat list of instructions.
+
+    Instruction i computes slot i. The first leaves instructions load the
+    constants, the rest follow in topological order, so every argument is
+    computed before it is used. The plan holds only arrays and lists and can
+    be pickled.
+
+    Attributes:
+        vertices -- vertex computed by each instruction
+        opcodes -- CONST or the code of a registered operation for each instruction
+        constants -- values of the leaves, in slot order
+        arg_offsets -- arguments of instruction i are args[arg_offsets[i]:arg_offsets[i + 1]]
+        args -- slots read by the instructions
+        outputs -- sink vertices, in ascending order
+        output_slots -- slot of each sink
+    """
+
+    def __init__(self, vertices, opcodes, constants, arg_offsets, args, outputs, output_slots):
+        self.vertices = vertices
+        self.opcodes = opcodes
+        self.constants = constants
+        self.arg_offsets = arg_offsets
+        self.args = args
+        self.outputs = outputs
+        self.output_slots = output_slots
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    @property
+    def leaves(self):
+        return len(self.constants)
+
+
+def compile_plan(graph, order, operations, outputs=None):
+    """Compiles a graph with checked operations into a Plan.
+
+    order must be a topological order of graph, operations maps str(vertex)
+    to a number for the leaves and to the name of a registered operation for
+    the rest. outputs lists the vertices whose values are returned, the
+    sinks by default.
+    """
+    leaves = [v for v in order if not graph.in_degree(v)]
+    vertices = array('l', leaves)
+    vertices.extend(v for v in order if graph.in_degree(v))
+
+    slot = array('l', [0]) * (len(graph) + 1)
+    for i, v in enumerate(vertices):
+        slot[v] = i
+
+    opcodes = array('b', [CONST]) * len(leaves)
+    constants = [operations[str(v)] for v in leaves]
+    arg_offsets = array('l', [0]) * (len(leaves) + 1)
+    args = array('l')
+
+    for v in vertices[len(leaves):]:
+        opcodes.append(OPCODES[operations[str(v)]])
+        args.extend(slot[u] for u in graph.in_arcs(v)[0])
+        arg_offsets.append(len(args))
+
+    outputs = array('l', graph.sinks() if outputs is None else outputs)
+    output_slots = array('l', [slot[v] for v in outputs])
+
+    return Plan(vertices, opcodes, constants, arg_offsets, args, outputs, output_slots)
+
+
+def plan_operations(plan):
+    """Returns the operations map plan was compiled from."""
+    operations = {}
+    for i, v in enumerate(plan.vertices):
+        operations[str(v)] = plan.constants[i] if i < plan.leaves else NAMES[plan.opcodes[i]]
+
+    return operations
+
+
+def depths(plan):
+    """Returns the depth of every slot: 0 for a leaf, 1 + the deepest argument for the rest."""
+    depth = array('l', [0]) * len(plan)
+    get = depth.__getitem__
+    args, arg_offsets = memoryview(plan.args), plan.arg_offsets
+    for i in range(plan.leaves, len(plan)):
+        depth[i] = 1 + max(map(get, args[arg_offsets[i]:arg_offsets[i + 1]]))
+
+    return depth
+
+
+def kernels(attribute='scalar'):
+    """Returns the given kernel of every opcode, indexed by opcode."""
+    return [getattr(op, attribute) if op is not None else None for op in BY_CODE]
+
+
+def execute(plan, constants=None):
+    """Runs plan and returns the values of all slots.
+
+    constants replaces plan.constants for this run when given.
+    """
+    if constants is None:
+        constants = plan.constants
+    values = constants + [None] * (len(plan) - plan.leaves)
+    get = values.__getitem__
+    opcodes, arg_offsets, args = plan.opcodes, plan.arg_offsets, memoryview(plan.args)
+    scalar = kernels()
+
+    for i in range(plan.leaves, len(plan)):
+        values[i] = scalar[opcodes[i]](list(map(get, args[arg_offsets[i]:arg_offsets[i + 1]])))
+
+    return values
+
+
+def evaluate(plan, constants=None):
+    """Runs plan and returns the values of the sinks, keyed by vertex."""
+    values = execute(plan, constants)
+
+    return {v: values[s] for v, s in zip(plan.outputs, plan.output_slots)}
@@ -0,0 +1,98 @@
+import io
+from array import array
+
+from graphnet.exceptions import CycleException
+
+# number of pieces collected before they are written to the output at once
+_FLUSH = 1 << 12
+
+
+def _uses(graph):
+    return array('l', [graph.out_degree(v) for v in range(len(graph) + 1)])
+
+
+def _write_expression(out, graph, v, label, references=None):
+    # Writes the prefix expression of v with an explicit stack of vertices
+    # and punctuation, so that every character is produced once and nothing
+    # recurses. A vertex below v found in references is written as its
+    # reference instead of being expanded.
+    pieces = []
+    stack = [v]
+    while stack:
+        item = stack.pop()
+        if type(item) is str:
+            pieces.append(item)
+            continue
+
+        if references is not None and item != v and item in references:
+            pieces.append(references[item])
+            continue
+
+        sources = graph.in_arcs(item)[0]
+        if not len(sources):
+            pieces.append(label(item))
+            continue
+
+        pieces.append(label(item) + '(')
+        stack.append(')')
+        for k in range(len(sources) - 1, 0, -1):
+            stack.append(sources[k])
+            stack.append(', ')
+        stack.append(sources[0])
+
+        if len(pieces) >= _FLUSH:
+            out.write(''.join(pieces))
+            pieces.clear()
+
+    out.write(''.join(pieces))
+
+
+def prefix_expressions(graph, label=str, outputs=None):
+    """Returns the prefix expression of every vertex of outputs, keyed by vertex.
+
+    outputs are the sinks of graph by default. Every expression is streamed
+    into its own buffer, so the time is linear in the length of the result.
+    """
+    if outputs is None:
+        outputs = graph.sinks()
+
+    expressions = {}
+    for v in outputs:
+        buffer = io.StringIO()
+        _write_expression(buffer, graph, v, label)
+        expressions[v] = buffer.getvalue()
+
+    return expressions
+
+
+def write_prefix(out, graph, order, label=str, shared=False):
+    """Writes the prefix expressions of all sinks of graph to out.
+
+    The expressions are streamed into out, the time is linear in the length
+    of the output. With shared set, every inner vertex used more than once
+    is written once as a 'let $v = ...' line, in topological order, and
+    referenced as $v afterwards, so the output grows linearly with the graph
+    instead of with the number of paths.
+    """
+    references = None
+    if shared:
+        uses = _uses(graph)
+        references = {}
+        for v in order:
+            if uses[v] > 1 and graph.in_degree(v):
+                out.write(f'let ${v} = ')
+                _write_expression(out, graph, v, label, references)
+                out.write('\n')
+                references[v] = f'${v}'
+
+    for i, v in enumerate(graph.sinks()):
+        if i:
+            out.write(', ')
+        _write_expression(out, graph, v, label, references)
+
+
+def cycle_finding(graph, order, out, shared=False):
+    if not graph.sinks():
+        raise CycleException(1, len(graph))
+
+    write_prefix(out, graph, order, shared=shared)
@@ -0,0 +1,169 @@
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger(__name__)
+
+# profiler collecting the stages, None when profiling is off
+_active = None
+
+
+class Stage:
+    """Measurements of one pipeline stage.
+
+    Attributes:
+        name -- name of the stage, nested stages are joined with '/'
+        seconds -- wall time
+        peak_bytes -- peak of the memory traced by tracemalloc while the stage ran, None without tracing
+        items -- number of items the stage processed, set by the stage itself, None when not counted
+    """
+
+    __slots__ = ('name', 'seconds', 'peak_bytes', 'items')
+
+    def __init__(self, name, items=None):
+        self.name = name
+        self.seconds = None
+        self.peak_bytes = None
+        self.items = items
+
+    def as_dict(self):
+        return {'stage': self.name, 'seconds': self.seconds, 'peak_bytes': self.peak_bytes, 'items': self.items}
+
+
+class Profiler:
+    """Collects the stages run while it is active and reports them on exit.
+
+    The report is logged at INFO level and written as JSON to json_file when
+    given. With dump_file the whole run is also profiled with cProfile and
+    the statistics are saved there for pstats or snakeviz. Tracing memory
+    slows the program down, the timings are comparable only between runs
+    with the same memory setting.
+
+    Attributes:
+        stages -- finished stages, in the order they finished
+        memory -- whether the peak memory is traced
+        json_file -- file for the JSON report, None for the log only
+        dump_file -- file for the cProfile statistics, None for no cProfile
+    """
+
+    def __init__(self, memory=True, json_file=None, dump_file=None):
+        self.stages = []
+        self.memory = memory
+        self.json_file = json_file
+        self.dump_file = dump_file
+        self._path = []
+        self._open = []
+        self._profile = None
+        self._started = None
+
+    def __enter__(self):
+        global _active
+        _active = self
+
+        if self.memory:
+            import tracemalloc
+
+            tracemalloc.start()
+        if self.dump_file is not None:
+            import cProfile
+
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self._started = time.perf_counter()
+
+        return self
+
+    def __exit__(self, *exc_info):
+        global _active
+        total = time.perf_counter() - self._started
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(self.dump_file)
+
+        peak = None
+        if self.memory:
+            import tracemalloc
+
+            peak = max([tracemalloc.get_traced_memory()[1]] + [s.peak_bytes for s in self.stages])
+            tracemalloc.stop()
+        _active = None
+
+        whole = Stage('total')
+        whole.seconds, whole.peak_bytes = total, peak
+        self.stages.append(whole)
+        self.report()
+
+    def enter(self, record):
+        self._path.append(record.name)
+        record.name = '/'.join(self._path)
+        self._open.append(record)
+        if self.memory:
+            self._peak()
+        record.seconds = time.perf_counter()
+
+    def exit(self, record):
+        record.seconds = time.perf_counter() - record.seconds
+        if self.memory:
+            self._peak()
+        self._open.pop()
+        self._path.pop()
+        self.stages.append(record)
+
+    def _peak(self):
+        # the peak is reset at every stage boundary, so it is passed on to
+        # all stages still open before that
+        import tracemalloc
+
+        peak = tracemalloc.get_traced_memory()[1]
+        for record in self._open:
+            record.peak_bytes = max(record.peak_bytes or 0, peak)
+        tracemalloc.reset_peak()
+
+    def report(self):
+        for s in self.stages:
+            logger.info('Этап %s: %.6f с%s%s', s.name, s.seconds,
+                        '' if s.peak_bytes is None else f', пик памяти {s.peak_bytes / 2 ** 20:.1f} МиБ',
+                        '' if s.items is None else f', элементов {s.items}')
+
+        if self.json_file is not None:
+            import json
+
+            with open(self.json_file, 'w') as output:
+                json.dump({'stages': [s.as_dict() for s in self.stages]}, output, indent=2, ensure_ascii=False)
+
+
+@contextmanager
+def stage(name, items=None):
+    """Measures the enclosed code as a stage of the active profiler.
+
+    Yields the Stage record, so that the stage can set its items once they
+    are known. Without an active profiler nothing is measured.
+    """
+    record = Stage(name, items)
+    profiler = _active
+    if profiler is None:
+        yield record
+        return
+
+    profiler.enter(record)
+    try:
+        yield record
+    finally:
+        profiler.exit(record)
+
+
+def add_profile_arguments(parser):
+    parser.add_argument('--profile', nargs='?', const='', metavar='JSON',
+                        help='Замерить время, память и объем данных по этапам; с именем файла записать отчет в JSON')
+    parser.add_argument('--profile-dump', dest='profile_dump', metavar='FILE',
+                        help='Сохранить статистику cProfile всего запуска в файл')
+    parser.add_argument('--profile-no-memory', action='store_false', dest='profile_memory',
+                        help='Не измерять память при --profile, замеры времени становятся точнее')
+
+
+def profiler_from_arguments(args):
+    """Returns a Profiler for the --profile arguments, or a context doing nothing without them."""
+    if args.profile is None and args.profile_dump is None:
+        return nullcontext()
+
+    return Profiler(args.profile_memory, args.profile or None, args.profile_dump)
@@ -0,0 +1,233 @@
+import re
+from array import array
+
+from graphnet.exceptions import InputException
+from graphnet.graph import Graph
+from graphnet.profiling import stage
+from graphnet.validation import NumberingValidator
+from graphnet.xml_format import XmlEdges, is_xml
+
+CHUNK_SIZE = 1 << 20
+
+# Every arc is preceded by a comma. The stream is primed with one, so the
+# first arc matches the same pattern as the rest. Any other non-space byte
+# is captured by the last group and reported as an input error.
+_TOKEN = re.compile(rb'\s*,\s*\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*\)|\s*,?\s*(\S)')
+
+# Maps every digit to b'0' and every space to b' '.
+_SHAPE = bytes.maketrans(b'0123456789\t\n\v\f\r', b'0000000000     ')
+_SPACES = b' \t\n\v\f\r'
+# Maps every digit to b'0' and keeps the rest, with the spaces but b'\n'
+# deleted it shows where lines break.
+_LINES = bytes.maketrans(b'0123456789', b'0000000000')
+_BLANKS = b' \t\v\f\r'
+# Maps every byte but the digits to b' ', leaving the numbers to split().
+_NUMBERS = bytes(c if 48 <= c <= 57 else 32 for c in range(256))
+
+
+def _well_formed(block):
+    # True when block is a sequence of ', (u, v, order)' with spaces only
+    # around commas and parentheses, the layout every writer produces. Each
+    # test is one translate, replace or search over the whole block. False
+    # means the block has to go through the tokenizer, which finds the bad
+    # line or accepts a less usual layout.
+    text = block.translate(_SHAPE)
+    if text.translate(None, b'0 ,()') or b'0 ' in text:
+        return False
+
+    packed = block.translate(_SHAPE, _SPACES)
+    if packed[:1] not in (b',', b''):
+        return False
+    if packed.translate(None, b'0').replace(b',(,,)', b''):
+        return False
+
+    # with the punctuation right, the digits have to fill the three numbers
+    # of every arc and nothing else
+    n = packed.count(b'(')
+    return packed.count(b',(') == n and packed.count(b'(0') == n and packed.count(b',0') == 2 * n \
+        and b')0' not in packed
+
+
+def _tokenize(buf, end, line, input_file_name):
+    pos = 0
+    for m in _TOKEN.finditer(buf, 0, end):
+        if m.lastindex == 4:
+            raise InputException(input_file_name, line + buf.count(b'\n', pos, m.start(4)))
+
+        start = m.start(1)
+        line += buf.count(b'\n', pos, start)
+        pos = start
+
+        yield int(m.group(1)), int(m.group(2)), int(m.group(3)), line
+
+
+def _blocks(input_graph, chunk_size):
+    # Yields (buf, end) so that buf[:end] holds whole arcs only, the rest of
+    # buf is carried over to the next block.
+    tail = b','
+    while True:
+        chunk = input_graph.read(chunk_size)
+        buf = tail + chunk
+
+        if not chunk:
+            yield buf, len(buf)
+            return
+
+        # an arc never contains ')', so everything up to the last one can be
+        # tokenized without cutting an arc in half
+        end = buf.rfind(b')') + 1
+        if end:
+            yield buf, end
+            tail = buf[end:]
+        else:
+            tail = buf
+
+
+def _parse_block(block, line, input_file_name):
+    # Returns the arcs of block as (tails, heads, orders, runs, error). runs
+    # lists (line, count) for the arcs of each line in turn. error is the
+    # InputException of a syntax error after the returned arcs, or None, so
+    # that errors in the arcs before it are reported first.
+    if _well_formed(block) and b'(\n' not in block.translate(_LINES, _BLANKS):
+        # no arc starts on one line and goes on on the next, so each arc
+        # belongs to the line of its '('
+        numbers = array('l', map(int, block.translate(_NUMBERS).split()))
+        runs = [(line + i, k) for i, k in enumerate([text.count(b'(') for text in block.split(b'\n')]) if k]
+        return numbers[0::3], numbers[1::3], numbers[2::3], runs, None
+
+    tails, heads, orders = array('l'), array('l'), array('l')
+    runs = []
+    error = None
+    try:
+        for u, v, order, arc_line in _tokenize(block, len(block), line, input_file_name):
+            tails.append(u)
+            heads.append(v)
+            orders.append(order)
+            if runs and runs[-1][0] == arc_line:
+                runs[-1] = (arc_line, runs[-1][1] + 1)
+            else:
+                runs.append((arc_line, 1))
+    except InputException as e:
+        error = e
+
+    return tails, heads, orders, runs, error
+
+
+def _first_zero(tails, heads):
+    # index of the first arc from or to vertex 0, len(tails) when there is none
+    first = len(tails)
+    for numbers in (tails, heads):
+        try:
+            first = min(first, numbers.index(0))
+        except ValueError:
+            pass
+
+    return first
+
+
+def _line_of(runs, arc):
+    for line, count in runs:
+        if arc < count:
+            return line
+        arc -= count
+
+
+def iter_blocks(input_file_name, chunk_size=CHUNK_SIZE):
+    """Yields the arcs of the edge list file block by block.
+
+    Every block comes as (tails, heads, orders, runs, error), where runs
+    lists (line, count) for the arcs of every line of the block in turn and
+    error is an InputException to raise after the arcs of the block, or
+    None. Vertex 0 is reported as an error of its line here, so an arc
+    with it ends the block before it.
+
+    The file is read in chunks of chunk_size bytes. A chunk in the layout
+    every writer produces is parsed with a few bytes operations over the
+    whole chunk; any other chunk goes through the tokenizer, which finds
+    the line of the first malformed arc or accepts a less usual layout.
+    """
+    line = 1
+
+    with open(input_file_name, 'rb') as input_graph:
+        for buf, end in _blocks(input_graph, chunk_size):
+            block = buf[:end]
+            tails, heads, orders, runs, error = _parse_block(block, line, input_file_name)
+
+            zero = _first_zero(tails, heads)
+            if zero < len(tails):
+                error = InputException(input_file_name, _line_of(runs, zero))
+                tails, heads, orders = tails[:zero], heads[:zero], orders[:zero]
+                runs = _cut(runs, zero)
+
+            yield tails, heads, orders, runs, error
+            if error is not None:
+                return
+
+            line += block.count(b'\n')
+
+
+def _cut(runs, arcs):
+    # runs of the first arcs arcs
+    cut = []
+    for line, count in runs:
+        if arcs <= 0:
+            break
+        cut.append((line, min(count, arcs)))
+        arcs -= count
+
+    return cut
+
+
+def iter_edges(input_file_name, chunk_size=CHUNK_SIZE):
+    """Yields (from, to, order, line) for every arc of the edge list file.
+
+    The file is read in chunks of chunk_size bytes, so memory use does not
+    depend on the file size.
+    """
+    for tails, heads, orders, runs, error in iter_blocks(input_file_name, chunk_size):
+        arc = 0
+        for line, count in runs:
+            for k in range(arc, arc + count):
+                yield tails[k], heads[k], orders[k], line
+            arc += count
+
+        if error is not None:
+            raise error
+
+
+def read_graph(input_file_name):
+    tails = array('l')
+    heads = array('l')
+    orders = array('l')
+    numbering = NumberingValidator(input_file_name)
+    edges = XmlEdges(input_file_name) if is_xml(input_file_name) else None
+
+    with stage('parse') as parsed:
+        if isinstance(edges, XmlEdges):
+            for u, v, order, line in edges:
+                numbering.add(v, order, line)
+
+                tails.append(u)
+                heads.append(v)
+                orders.append(order)
+        else:
+            for block_tails, block_heads, block_orders, runs, error in iter_blocks(input_file_name):
+                numbering.add_block(block_heads, block_orders, runs)
+                if error is not None:
+                    raise error
+
+                tails.extend(block_tails)
+                heads.extend(block_heads)
+                orders.extend(block_orders)
+        parsed.items = len(heads)
+
+    with stage('check numbering'):
+        numbering.finish(heads, orders)
+
+    size = edges.vertices if isinstance(edges, XmlEdges) else 0
+
+    with stage('build graph') as built:
+        graph = Graph.from_arcs(tails, heads, orders, size)
+        built.items = len(graph)
+
+    return graph
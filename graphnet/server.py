@@ -0,0 +1,154 @@
+import asyncio
+import json
+import logging
+import threading
+
+from graphnet.cli import run_command
+from graphnet.exceptions import RequestException
+from graphnet.incremental import IncrementalEvaluator
+from graphnet.plan import evaluate
+
+logger = logging.getLogger(__name__)
+
+
+class Network:
+    """Compiled network kept in memory by the server.
+
+    Attributes:
+        name -- name requests refer to
+        plan -- compiled plan of the network
+        leaves -- slot of every leaf vertex
+        evaluator -- incremental evaluator holding the leaf values set by updates
+    """
+
+    def __init__(self, name, plan):
+        self.name = name
+        self.plan = plan
+        self.leaves = {v: i for i, v in enumerate(plan.vertices[:plan.leaves])}
+        self.evaluator = None
+        # updates run in executor threads and change the evaluator in place
+        self._lock = threading.Lock()
+
+    def _leaf_values(self, overrides):
+        leaf_values = {}
+        for vertex, value in overrides.items():
+            if not str(vertex).isdigit() or int(vertex) not in self.leaves:
+                raise RequestException(f'Вершина \'{vertex}\' не является листом графа \'{self.name}\'')
+            if type(value) not in (int, float):
+                raise RequestException(f'Значение вершины \'{vertex}\' должно быть числом')
+            leaf_values[int(vertex)] = value
+
+        return leaf_values
+
+    def evaluate(self, overrides):
+        constants = list(self.plan.constants)
+        for vertex, value in self._leaf_values(overrides).items():
+            constants[self.leaves[vertex]] = value
+
+        return evaluate(self.plan, constants)
+
+    def update(self, changes):
+        with self._lock:
+            if self.evaluator is None:
+                self.evaluator = IncrementalEvaluator(self.plan)
+
+            return self.evaluator.update(self._leaf_values(changes))
+
+
+async def handle_request(networks, line):
+    """Evaluates one JSON request line and returns the response object.
+
+    A request looks like {"id": 1, "graph": "name", "values": {"1": 5}},
+    graph may be left out when only one network is loaded and values replace
+    the constants of the given leaves. The response carries the same id and
+    either the values of all sinks or an error message.
+
+    A request with "update" instead of "values" changes the leaves of the
+    network for all later updates, only their ancestors are recomputed. The
+    response lists the sinks that changed under "changed".
+
+    The evaluation runs in the default executor of the event loop, so a
+    large network does not hold up the requests of other connections.
+    """
+    loop = asyncio.get_running_loop()
+    response = {}
+    try:
+        try:
+            request = json.loads(line)
+        except ValueError:
+            raise RequestException('Запрос не является JSON')
+        if not isinstance(request, dict):
+            raise RequestException('Запрос должен быть объектом')
+        response['id'] = request.get('id')
+
+        name = request.get('graph')
+        if name is None and len(networks) == 1:
+            name = next(iter(networks))
+        if not isinstance(name, str):
+            raise RequestException('Поле graph должно быть строкой')
+        if name not in networks:
+            raise RequestException(f'Граф \'{name}\' не загружен')
+
+        if 'update' in request:
+            changes = request['update']
+            if not isinstance(changes, dict):
+                raise RequestException('Поле update должно быть объектом')
+
+            changed = await loop.run_in_executor(None, networks[name].update, changes)
+            response['changed'] = {str(v): value for v, value in changed.items()}
+            return response
+
+        overrides = request.get('values') or {}
+        if not isinstance(overrides, dict):
+            raise RequestException('Поле values должно быть объектом')
+
+        values = await loop.run_in_executor(None, networks[name].evaluate, overrides)
+        response['values'] = {str(v): value for v, value in values.items()}
+    except RequestException as e:
+        response['error'] = e.message
+    except (OverflowError, ZeroDivisionError) as e:
+        response['error'] = f'Ошибка вычисления: {e}'
+
+    return response
+
+
+async def _serve_client(networks, reader, writer):
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+
+            response = await handle_request(networks, line)
+            writer.write(json.dumps(response, ensure_ascii=False).encode() + b'\n')
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(networks, socket_path=None, host='127.0.0.1', port=None):
+    def client(reader, writer):
+        return _serve_client(networks, reader, writer)
+
+    if socket_path is not None:
+        server = await asyncio.start_unix_server(client, path=socket_path)
+    else:
+        server = await asyncio.start_server(client, host=host, port=port)
+
+    for sock in server.sockets:
+        logging.info('Сервер ожидает запросы на %s', sock.getsockname())
+
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    run_command('serve')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+from array import array
+
+from graphnet.exceptions import CycleException
+
+
+def topological_order(graph):
+    """Returns the vertices of graph ordered so that every arc goes forward.
+
+    Kahn's algorithm over the CSR arrays, O(V + E) with no recursion. When
+    some vertices are left over, CycleException is raised with a cycle
+    among them.
+    """
+    offsets, targets, in_offsets = graph.offsets, graph.targets, graph.in_offsets
+
+    remaining = array('l', [0]) * (len(graph) + 1)
+    for v in range(1, len(graph) + 1):
+        remaining[v] = in_offsets[v + 1] - in_offsets[v]
+
+    # the order doubles as the queue of vertices with no unvisited in-arcs
+    order = array('l', [v for v in range(1, len(graph) + 1) if not remaining[v]])
+    i = 0
+    while i < len(order):
+        v = order[i]
+        i += 1
+        for k in range(offsets[v], offsets[v + 1]):
+            u = targets[k]
+            remaining[u] -= 1
+            if not remaining[u]:
+                order.append(u)
+
+    if len(order) < len(graph):
+        cycle = _find_cycle(graph, remaining)
+        raise CycleException(cycle[0], cycle[1 % len(cycle)], cycle)
+
+    return order
+
+
+def _find_cycle(graph, remaining):
+    # every vertex left by Kahn's algorithm has an in-arc from another one, so
+    # walking back along such arcs must come to a vertex seen before
+    v = next(v for v in range(1, len(graph) + 1) if remaining[v])
+    position = {}
+    path = []
+
+    while v not in position:
+        position[v] = len(path)
+        path.append(v)
+        for u in graph.in_arcs(v)[0]:
+            if remaining[u]:
+                v = u
+                break
+
+    cycle = path[position[v]:]
+    cycle.reverse()
+
+    return cycle
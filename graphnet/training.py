@@ -0,0 +1,247 @@
+import itertools
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from graphnet.cli import run_command
+from graphnet.exceptions import OperationFormatException
+
+logger = logging.getLogger(__name__)
+
+CHUNK_ROWS = 1 << 14
+
+# derivative of each activation expressed through its output
+DERIVATIVES = {
+    'identity': lambda a: 1,
+    'relu': lambda a: a > 0,
+    'sigmoid': lambda a: a * (1 - a),
+    'tanh': lambda a: 1 - a * a,
+    'exp': lambda a: a,
+}
+
+
+def iter_chunks(file_name, chunk_rows=CHUNK_ROWS):
+    """Yields the rows of a .npy or CSV matrix in blocks of chunk_rows.
+
+    A .npy file is memory-mapped and sliced, a CSV file is parsed
+    chunk_rows lines at a time, so neither is loaded whole.
+    """
+    if file_name.endswith('.npy'):
+        matrix = np.load(file_name, mmap_mode='r')
+        for lo in range(0, len(matrix), chunk_rows):
+            yield matrix[lo:lo + chunk_rows]
+        return
+
+    with open(file_name, 'r') as input_matrix:
+        while True:
+            lines = list(itertools.islice(input_matrix, chunk_rows))
+            if not lines:
+                return
+            yield np.loadtxt(lines, delimiter=',', ndmin=2)
+
+
+class Dataset:
+    """Samples of a layer network read from one file per input and target layer.
+
+    Iterating yields (inputs, targets) pairs of dicts keyed by vertex, with
+    up to chunk_rows rows each. Every iteration reads the files again.
+
+    Attributes:
+        data -- (vertex, file name) of every input layer
+        targets -- (vertex, file name) of every sink layer
+        chunk_rows -- number of rows read at a time
+    """
+
+    def __init__(self, data, targets, chunk_rows=CHUNK_ROWS):
+        self.data = data
+        self.targets = targets
+        self.chunk_rows = chunk_rows
+
+    def __iter__(self):
+        files = self.data + self.targets
+        readers = [iter_chunks(file_name, self.chunk_rows) for _, file_name in files]
+        for blocks in zip(*readers):
+            if len({len(block) for block in blocks}) > 1:
+                raise OperationFormatException(files[0][1], '', 'Количество строк во входных данных различается', kind='данных')
+            values = [(vertex, block) for (vertex, _), block in zip(files, blocks)]
+            yield dict(values[:len(self.data)]), dict(values[len(self.data):])
+
+
+def backward(network, values, output_grads):
+    """Propagates the gradients of the sink outputs back through the network.
+
+    values are the outputs of all layers from LayerNetwork.activations.
+    Returns the gradients of the weights and biases of the dense layers,
+    keyed by vertex, as (weights, bias) pairs.
+    """
+    graph, layers = network.graph, network.layers
+    grads = dict(output_grads)
+    params = {}
+
+    def accumulate(u, g):
+        grads[u] = grads[u] + g if u in grads else g
+
+    for v in reversed(network.order):
+        g = grads.pop(v, None)
+        layer = layers[v]
+        if g is None or layer.kind == 'input':
+            continue
+
+        sources = graph.in_arcs(v)[0]
+        if layer.kind == 'dense':
+            dz = g * DERIVATIVES[layer.activation](values[v])
+            arguments = [values[u] for u in sources]
+            x = arguments[0] if len(arguments) == 1 else np.concatenate(arguments, axis=1)
+            params[v] = x.T @ dz, dz.sum(axis=0) if layer.bias is not None else None
+
+            dx = dz @ layer.weights.T
+            lo = 0
+            for u in sources:
+                accumulate(u, dx[:, lo:lo + layers[u].size])
+                lo += layers[u].size
+        elif layer.kind == '+':
+            for u in sources:
+                accumulate(u, g)
+        else:
+            arguments = [values[u] for u in sources]
+            for k, u in enumerate(sources):
+                others = g
+                for j, x in enumerate(arguments):
+                    if j != k:
+                        others = others * x
+                accumulate(u, others)
+
+    return params
+
+
+class Momentum:
+    """SGD with momentum over the dense layers of a network.
+
+    The weights and biases are copied out of their memory-mapped files into
+    writable arrays of dtype when the optimizer is created.
+
+    Attributes:
+        network -- trained network
+        learning_rate -- step size
+        momentum -- share of the previous step kept, 0 gives plain SGD
+        velocity -- previous step of every weight and bias, keyed by vertex
+    """
+
+    def __init__(self, network, learning_rate, momentum=0.0, dtype=np.float64):
+        self.network = network
+        self.learning_rate = learning_rate
+        self.momentum = momentum
+        self.velocity = {}
+
+        for v, layer in network.layers.items():
+            if layer.kind == 'dense':
+                layer.weights = np.array(layer.weights, dtype=dtype)
+                if layer.bias is not None:
+                    layer.bias = np.array(layer.bias, dtype=dtype)
+                self.velocity[v] = np.zeros_like(layer.weights), np.zeros_like(layer.bias) \
+                    if layer.bias is not None else None
+
+    def step(self, params):
+        for v, (dw, db) in params.items():
+            layer = self.network.layers[v]
+            vw, vb = self.velocity[v]
+            vw *= self.momentum
+            vw -= self.learning_rate * dw
+            layer.weights += vw
+            if db is not None:
+                vb *= self.momentum
+                vb -= self.learning_rate * db
+                layer.bias += vb
+
+
+def save_checkpoint(file_name, network):
+    """Writes the weights and biases of the dense layers to an .npz file.
+
+    The file is written next to its destination and renamed, so a crash
+    never leaves a half-written checkpoint.
+    """
+    arrays = {}
+    for v, layer in network.layers.items():
+        if layer.kind == 'dense':
+            arrays[f'weights{v}'] = layer.weights
+            if layer.bias is not None:
+                arrays[f'bias{v}'] = layer.bias
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file_name)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, file_name)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def load_checkpoint(file_name, network):
+    with np.load(file_name) as arrays:
+        for v, layer in network.layers.items():
+            if layer.kind != 'dense':
+                continue
+            if f'weights{v}' not in arrays or arrays[f'weights{v}'].shape != layer.weights.shape:
+                raise OperationFormatException(file_name, '', f'Контрольная точка не подходит к слою вершины \'{v}\'', kind='контрольной точки')
+            layer.weights = arrays[f'weights{v}']
+            if layer.bias is not None:
+                layer.bias = arrays[f'bias{v}']
+
+
+def train(network, dataset, epochs, batch_size, optimizer, dtype=np.float64, checkpoint=None):
+    """Fits the dense layers of network to dataset with mini-batch gradient descent.
+
+    The loss is half the squared error summed over the sink outputs and
+    averaged over the samples of a mini-batch. Returns one dict per epoch
+    with the mean loss, the number of samples, the time and the samples per
+    second. The checkpoint file is rewritten after every epoch.
+    """
+    history = []
+    for epoch in range(1, epochs + 1):
+        started = time.perf_counter()
+        samples = 0
+        total_loss = 0.0
+
+        for inputs, targets in dataset:
+            for lo in range(0, len(next(iter(targets.values()))), batch_size):
+                batch = {v: x[lo:lo + batch_size] for v, x in inputs.items()}
+                values = network.activations(batch, dtype)
+                rows = len(next(iter(batch.values())))
+
+                output_grads = {}
+                for v, target in targets.items():
+                    error = values[v] - np.asarray(target[lo:lo + batch_size], dtype=dtype)
+                    total_loss += 0.5 * float(np.sum(error * error))
+                    output_grads[v] = error / rows
+
+                optimizer.step(backward(network, values, output_grads))
+                samples += rows
+
+        elapsed = time.perf_counter() - started
+        stats = {
+            'epoch': epoch,
+            'loss': total_loss / max(samples, 1),
+            'samples': samples,
+            'seconds': elapsed,
+            'samples_per_second': samples / elapsed if elapsed else 0.0,
+        }
+        history.append(stats)
+        logging.info('Эпоха %d: ошибка %.6g, %d примеров за %.3f с, %.0f примеров/с', epoch, stats['loss'], samples,
+                     elapsed, stats['samples_per_second'])
+
+        if checkpoint is not None:
+            save_checkpoint(checkpoint, network)
+
+    return history
+
+
+def main():
+    run_command('train')
+
+
+if __name__ == '__main__':
+    main()
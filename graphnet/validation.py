@@ -0,0 +1,87 @@
+from array import array
+from bisect import bisect_right
+from collections import Counter
+
+from graphnet.exceptions import DataException
+
+
+class NumberingValidator:
+    """Checks that the orders of the arcs entering each vertex are a
+    permutation of 1..k, where k is the in-degree of the vertex.
+
+    Arcs are passed to add() or add_block() while the file is read. Orders
+    below 1 are reported at once, duplicates and gaps are found by finish()
+    in one pass with a flag per arc.
+
+    Attributes:
+        input_file -- input file's name
+        in_degree -- number of arcs entering each vertex, indexed by vertex
+        arcs -- number of arcs added
+    """
+
+    def __init__(self, input_file):
+        self.input_file = input_file
+        self.in_degree = array('l')
+        self.arcs = 0
+
+        # the line of arc i is _line_numbers[k] for the last _line_starts[k] <= i
+        self._line_starts = array('l')
+        self._line_numbers = array('l')
+
+    def add(self, v, order, line):
+        if not self._line_numbers or self._line_numbers[-1] != line:
+            self._line_starts.append(self.arcs)
+            self._line_numbers.append(line)
+
+        if order < 1:
+            self._fail(v, self.arcs)
+
+        if v >= len(self.in_degree):
+            self.in_degree.extend(array('l', [0]) * (v + 1 - len(self.in_degree)))
+        self.in_degree[v] += 1
+        self.arcs += 1
+
+    def add_block(self, heads, orders, runs):
+        """Adds many arcs at once, as add() would one by one.
+
+        runs lists (line, count) for the arcs of every line in turn.
+        """
+        arc = self.arcs
+        for line, count in runs:
+            if not self._line_numbers or self._line_numbers[-1] != line:
+                self._line_starts.append(arc)
+                self._line_numbers.append(line)
+            arc += count
+
+        if orders and min(orders) < 1:
+            i = next(i for i, order in enumerate(orders) if order < 1)
+            self._fail(heads[i], self.arcs + i)
+
+        if heads and max(heads) >= len(self.in_degree):
+            self.in_degree.extend(array('l', [0]) * (max(heads) + 1 - len(self.in_degree)))
+        for v, count in Counter(heads).items():
+            self.in_degree[v] += count
+        self.arcs += len(heads)
+
+    def line(self, arc):
+        return self._line_numbers[bisect_right(self._line_starts, arc) - 1]
+
+    def finish(self, heads, orders):
+        in_degree = self.in_degree
+        offsets = array('l', [0]) * len(in_degree)
+        for v in range(1, len(in_degree)):
+            offsets[v] = offsets[v - 1] + in_degree[v - 1]
+
+        seen = bytearray(self.arcs)
+        for i, v in enumerate(heads):
+            order = orders[i]
+            if order > in_degree[v]:
+                self._fail(v, i)
+
+            pos = offsets[v] + order - 1
+            if seen[pos]:
+                self._fail(v, i)
+            seen[pos] = 1
+
+    def _fail(self, v, arc):
+        raise DataException(self.input_file, self.line(arc), f'Неправильная нумерация дуг, входящих в вершину {v}')
@@ -0,0 +1,99 @@
+from graphnet.exceptions import InputException
+
+XML_HEADER = '<?xml version="1.0" ?>\n<graph>\n'
+XML_FOOTER = '</graph>\n'
+
+
+def write_xml(out, graph):
+    """Writes graph to out in the layout of minidom's toprettyxml.
+
+    Elements are written while walking the adjacency, nothing but the
+    current vertex is held in memory.
+    """
+    write = out.write
+    write(XML_HEADER)
+
+    for v in range(1, len(graph) + 1):
+        write(f'\t<vertex>v{v}</vertex>\n')
+
+    for v in range(1, len(graph) + 1):
+        targets, orders = graph.out_arcs(v)
+        for to, order in zip(targets, orders):
+            write(f'\t<arc>\n\t\t<from>v{v}</from>\n\t\t<to>v{to}</to>\n\t\t<order>{order}</order>\n\t</arc>\n')
+
+    write(XML_FOOTER)
+
+
+def is_xml(file_name):
+    with open(file_name, 'rb') as f:
+        return f.read(64).lstrip().startswith(b'<')
+
+
+def _vertex(text, input_file_name, line):
+    if not text or text[0] != 'v' or not text[1:].isdigit() or not int(text[1:]):
+        raise InputException(input_file_name, line)
+
+    return int(text[1:])
+
+
+class XmlEdges:
+    """Iterates over the arcs of a task1 XML file as (from, to, order, line).
+
+    The file is fed line by line to an XMLPullParser, the incremental parser
+    behind ET.iterparse, so every arc comes with the line of its closing tag.
+    The root is cleared after each element, memory use does not depend on
+    the file size.
+
+    Attributes:
+        input_file -- input file's name
+        vertices -- largest id among the <vertex> elements read so far
+    """
+
+    def __init__(self, input_file):
+        self.input_file = input_file
+        self.vertices = 0
+
+    def _events(self, parser):
+        line = 0
+        with open(self.input_file, 'rb') as input_graph:
+            for line, data in enumerate(input_graph, 1):
+                parser.feed(data)
+                for event, elem in parser.read_events():
+                    yield event, elem, line
+        parser.close()
+        for event, elem in parser.read_events():
+            yield event, elem, line
+
+    def __iter__(self):
+        import xml.etree.ElementTree as ET
+
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        root = None
+
+        try:
+            for event, elem, line in self._events(parser):
+                if root is None:
+                    if elem.tag != 'graph':
+                        raise InputException(self.input_file, line)
+                    root = elem
+                    continue
+                if event == 'start':
+                    continue
+
+                if elem.tag == 'arc':
+                    u = _vertex(elem.findtext('from'), self.input_file, line)
+                    v = _vertex(elem.findtext('to'), self.input_file, line)
+                    order = elem.findtext('order')
+                    if not order or not order.isdigit():
+                        raise InputException(self.input_file, line)
+                    root.clear()
+
+                    yield u, v, int(order), line
+                elif elem.tag == 'vertex':
+                    self.vertices = max(self.vertices, _vertex(elem.text, self.input_file, line))
+                    root.clear()
+        except ET.ParseError as e:
+            raise InputException(self.input_file, e.position[0])
+
+        if root is None:
+            raise InputException(self.input_file, 1)
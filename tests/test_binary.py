@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from graphnet import cli
+from graphnet.binary import is_binary, read_binary
+from graphnet.reader import read_graph
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INPUT2 = os.path.join(ROOT, 'input2.txt')
+INPUT3 = os.path.join(ROOT, 'input3.txt')
+OPERATIONS3 = os.path.join(ROOT, 'operations3.txt')
+
+
+def _run(tmp_path, name, *argv):
+    output = tmp_path / name
+    cli.main([*argv, '-o', str(output), '--no-cache'])
+    return output
+
+
+def _columns(graph):
+    return [list(a) for a in (graph.offsets, graph.targets, graph.orders, graph.in_offsets, graph.sources,
+                              graph.in_orders)]
+
+
+@pytest.mark.parametrize('command', ['to-xml', 'to-prefix'])
+def test_graph_round_trip(tmp_path, command):
+    binary = _run(tmp_path, 'graph.bin', command, '-i', INPUT2, '--format', 'bin')
+    assert is_binary(str(binary))
+
+    graph, order, operations = read_binary(str(binary))
+    assert _columns(graph) == _columns(read_graph(INPUT2))
+    assert operations is None
+    assert (order is None) == (command == 'to-xml')
+
+    for other in ('to-xml', 'to-prefix'):
+        from_text = _run(tmp_path, 'text.out', other, '-i', INPUT2).read_text()
+        assert _run(tmp_path, 'binary.out', other, '-i', str(binary)).read_text() == from_text
+
+
+def test_network_round_trip(tmp_path):
+    expected = _run(tmp_path, 'text.out', 'eval', '-i', INPUT3, '--operations', OPERATIONS3).read_text()
+
+    # with the operations stored in the file
+    network = _run(tmp_path, 'network.bin', 'eval', '-i', INPUT3, '--operations', OPERATIONS3, '--format', 'bin')
+    assert read_binary(str(network))[2] == {'1': 4, '2': '+', '3': '*', '4': '+', '5': 7, '6': 5, '7': 'exp',
+                                            '8': 'exp'}
+    assert _run(tmp_path, 'network.out', 'eval', '-i', str(network)).read_text() == expected
+
+    # and with a graph only, given the operations file
+    graph = _run(tmp_path, 'graph.bin', 'to-prefix', '-i', INPUT3, '--format', 'bin')
+    assert _run(tmp_path, 'graph.out', 'eval', '-i', str(graph), '--operations', OPERATIONS3).read_text() == expected
@@ -0,0 +1,48 @@
+import logging
+import os
+
+from graphnet.cache import GraphCache
+from graphnet.operations import load_network
+from graphnet.plan import evaluate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INPUT = os.path.join(ROOT, 'input3.txt')
+OPERATIONS = os.path.join(ROOT, 'operations3.txt')
+
+
+def test_entries_are_reused(tmp_path):
+    cache = GraphCache(str(tmp_path))
+    plan = load_network(INPUT, OPERATIONS, cache)[2]
+
+    key = cache.key(INPUT)
+    graph, order = cache.load_graph(key)
+    assert graph.arcs_count() == 8 and list(order)
+    assert evaluate(cache.load_plan(cache.key(INPUT, OPERATIONS))) == evaluate(plan)
+
+
+def test_unwritable_directory(tmp_path, caplog):
+    # a directory below a regular file can be neither created nor written
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    cache = GraphCache(str(blocker / 'cache'))
+
+    with caplog.at_level(logging.WARNING, logger='graphnet.cache'):
+        plan = load_network(INPUT, OPERATIONS, cache)[2]
+
+    assert evaluate(plan) == {3: 55, 4: 18, 8: 2.851123567946141e+64}
+    assert 'Не удалось записать в кэш' in caplog.text
+
+
+def test_failed_write_leaves_no_file(tmp_path, monkeypatch, caplog):
+    def replace(source, target):
+        raise OSError(28, 'No space left on device')
+
+    monkeypatch.setattr(os, 'replace', replace)
+    cache = GraphCache(str(tmp_path))
+
+    with caplog.at_level(logging.WARNING, logger='graphnet.cache'):
+        plan = load_network(INPUT, OPERATIONS, cache)[2]
+
+    assert evaluate(plan)[3] == 55
+    assert os.listdir(tmp_path) == []
+    assert cache.load_graph(cache.key(INPUT)) is None
@@ -0,0 +1,26 @@
+import os
+
+import pytest
+
+from graphnet.grad import gradients
+from graphnet.numeric import BACKENDS
+from graphnet.operations import load_network
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def plan():
+    return load_network(os.path.join(ROOT, 'input3.txt'), os.path.join(ROOT, 'operations3.txt'))[2]
+
+
+@pytest.mark.parametrize('backend', ['exact', 'float', 'float32'])
+def test_gradients(plan, backend):
+    grads = gradients(plan, forward=BACKENDS[backend])
+
+    assert {v: sorted(g) for v, g in grads.items()} == {3: [1, 5, 6], 4: [1, 5], 8: [6]}
+    assert grads[3] == {1: 5, 5: 5, 6: 11} and grads[4] == {1: 1, 5: 2}
+    if backend == 'exact':
+        assert all(type(d) is int for d in list(grads[3].values()) + list(grads[4].values()))
+    else:
+        assert all(isinstance(d, float) for g in grads.values() for d in g.values())
@@ -0,0 +1,82 @@
+import random
+from array import array
+
+import pytest
+
+from graphnet.exceptions import RequestException
+from graphnet.graph import Graph
+from graphnet.incremental import IncrementalEvaluator
+from graphnet.plan import compile_plan, evaluate
+from graphnet.topology import topological_order
+
+
+def _random_plan(seed, leaves=10, inner=60):
+    rnd = random.Random(seed)
+    tails, heads, orders = array('l'), array('l'), array('l')
+    operations = {str(v): rnd.randint(-2, 2) for v in range(1, leaves + 1)}
+    for v in range(leaves + 1, leaves + inner + 1):
+        arguments = rnd.sample(range(1, v), rnd.randint(1, min(3, v - 1)))
+        operations[str(v)] = rnd.choice(['+', '*', 'max']) if len(arguments) > 1 else 'relu'
+        for k, u in enumerate(arguments, 1):
+            tails.append(u)
+            heads.append(v)
+            orders.append(k)
+
+    graph = Graph.from_arcs(tails, heads, orders, leaves + inner)
+    return compile_plan(graph, topological_order(graph), operations)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_updates_match_full_evaluation(seed):
+    rnd = random.Random(seed)
+    plan = _random_plan(seed)
+    evaluator = IncrementalEvaluator(plan)
+    leaves = list(plan.vertices[:plan.leaves])
+    constants = dict(zip(leaves, plan.constants))
+
+    for _ in range(30):
+        changes = {v: rnd.randint(-3, 3) for v in rnd.sample(leaves, rnd.randint(1, 3))}
+        before = evaluator.sink_values()
+        changed = evaluator.update(changes)
+
+        constants.update(changes)
+        expected = evaluate(plan, [constants[v] for v in leaves])
+        assert evaluator.sink_values() == expected
+        assert changed == {v: value for v, value in expected.items() if value != before[v]}
+
+
+def _exp_chain():
+    # 6 = exp(exp(1 + 2)), the leaf and 1 + 2 are written before exp overflows
+    arcs = [(1, 3, 1), (2, 3, 2), (3, 4, 1), (4, 6, 1), (3, 5, 1)]
+    tails, heads, orders = (array('l', column) for column in zip(*arcs))
+    graph = Graph.from_arcs(tails, heads, orders)
+    operations = {'1': 1, '2': 1, '3': '+', '4': 'exp', '5': 'relu', '6': 'exp'}
+    return compile_plan(graph, topological_order(graph), operations)
+
+
+def test_overflow_restores_values():
+    evaluator = IncrementalEvaluator(_exp_chain())
+    values = list(evaluator.values)
+
+    with pytest.raises(OverflowError):
+        evaluator.update({1: 1000})
+    assert evaluator.values == values
+
+    # the evaluator still works after the failed update
+    assert evaluator.update({1: 0}) == {5: 1, 6: evaluate(evaluator.plan, [0, 1])[6]}
+
+
+def test_unknown_leaf_restores_values():
+    plan = _random_plan(1)
+    evaluator = IncrementalEvaluator(plan)
+    values = list(evaluator.values)
+    leaf = plan.vertices[0]
+
+    with pytest.raises(RequestException):
+        evaluator.update({leaf: plan.constants[0] + 1, len(plan) + 1: 5})
+    assert evaluator.values == values
+
+    with pytest.raises(RequestException):
+        # an inner vertex is not a leaf either
+        evaluator.update({leaf: plan.constants[0] + 1, plan.vertices[-1]: 5})
+    assert evaluator.values == values
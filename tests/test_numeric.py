@@ -0,0 +1,79 @@
+import math
+import os
+
+import pytest
+
+from graphnet.numeric import LogNumber, evaluate, log_add, log_exp, log_mul
+from graphnet.operations import load_network
+from graphnet.plan import evaluate as evaluate_plan
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the sinks of input3.txt with operations3.txt, as in output3.txt
+SINKS = {3: 55, 4: 18, 8: 2.851123567946141e+64}
+
+
+@pytest.fixture(scope='module')
+def plan():
+    return load_network(os.path.join(ROOT, 'input3.txt'), os.path.join(ROOT, 'operations3.txt'))[2]
+
+
+def test_plan(plan):
+    assert evaluate_plan(plan) == SINKS
+
+
+def test_exact(plan):
+    values = evaluate(plan, 'exact')
+
+    assert values == SINKS
+    assert type(values[3]) is int and type(values[4]) is int
+
+
+@pytest.mark.parametrize('backend', ['float', 'log'])
+def test_floating_backends(plan, backend):
+    values = evaluate(plan, backend)
+
+    # in the float range the log backend computes over the same floats
+    assert {v: float(value) for v, value in values.items()} == SINKS
+    assert [str(values[v]) for v in sorted(values)] == ['55.0', '18.0', '2.851123567946141e+64']
+
+
+def test_float32(plan):
+    values = evaluate(plan, 'float32')
+
+    assert (values[3], values[4]) == (55, 18)
+    # exp(exp(5)) is out of the float32 range
+    assert values[8] == math.inf
+
+
+def test_log_range(tmp_path):
+    graph = tmp_path / 'graph.txt'
+    graph.write_text('(1, 2, 1), (2, 3, 1), (3, 4, 1)')
+    operations = tmp_path / 'operations.txt'
+    operations.write_text('1 : 5\n2 : exp\n3 : exp\n4 : exp\n')
+    plan = load_network(str(graph), str(operations))[2]
+
+    assert evaluate(plan, 'float')[4] == math.inf
+    assert str(evaluate(plan, 'log')[4]).startswith('exp(')
+    with pytest.raises(OverflowError):
+        evaluate(plan, 'exact')
+
+
+def test_log_space_only_beyond_floats():
+    huge = log_exp([LogNumber.of(1000)])
+    assert huge.value is None and huge.log == 1000
+
+    # a sum or product with an operand beyond the float range is done over logarithms
+    assert log_add([huge, huge]).log == pytest.approx(1000 + math.log(2))
+    assert log_mul([huge, LogNumber.of(-2)]).sign == -1
+    # and comes back to floats once the result fits
+    product = log_mul([huge, LogNumber.of(1e-300)])
+    assert product.value == pytest.approx(math.exp(1000 - 300 * math.log(10)))
+
+    # small operands are summed exactly
+    assert log_add([LogNumber.of(0.1), LogNumber.of(0.2)]).value == 0.1 + 0.2
+    assert log_mul([LogNumber.of(3), LogNumber.of(7)]).value == 21
+    # a sum overflowing floats switches to logarithms
+    big = LogNumber.of(1e308)
+    assert log_add([big, big]).value is None
+    assert log_add([big, big]).log == pytest.approx(math.log(2) + math.log(1e308))
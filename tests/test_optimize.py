@@ -0,0 +1,98 @@
+import math
+from array import array
+
+import pytest
+
+from graphnet import cli
+from graphnet.graph import Graph
+from graphnet.optimize import optimize
+from graphnet.plan import compile_plan, evaluate
+from graphnet.topology import topological_order
+
+# 3 and 4 are the same sum of the leaves, 6 is a sink equal to both
+ARCS = [(1, 3, 1), (2, 3, 2), (1, 4, 1), (2, 4, 2), (3, 5, 1), (4, 5, 2), (1, 6, 1), (2, 6, 2)]
+OPERATIONS = {'1': 2, '2': 3, '3': '+', '4': '+', '5': '*', '6': '+'}
+
+# exp(exp(exp(5))) is out of the float range
+CHAIN = [(1, 2, 1), (2, 3, 1), (3, 4, 1)]
+CHAIN_OPERATIONS = {'1': 5, '2': 'exp', '3': 'exp', '4': 'exp'}
+
+
+def _graph(arcs):
+    tails, heads, orders = (array('l', column) for column in zip(*arcs))
+    graph = Graph.from_arcs(tails, heads, orders)
+    return graph, topological_order(graph)
+
+
+def _sinks(reduction, graph):
+    plan = compile_plan(reduction.graph, reduction.order, reduction.operations, sorted(set(reduction.outputs)))
+    values = evaluate(plan)
+    return {v: values[w] for v, w in zip(graph.sinks(), reduction.outputs)}
+
+
+def test_merges_identical_vertices():
+    graph, order = _graph(ARCS)
+    reduction = optimize(graph, order, OPERATIONS)
+
+    assert (reduction.merged, reduction.folded, reduction.removed) == (2, 0, 2)
+    assert len(reduction.graph) == 4
+    # 4 and the sink 6 are computed by the vertex kept for 3
+    assert reduction.representative[3] == reduction.representative[4] == reduction.representative[6]
+    assert reduction.originals[reduction.representative[6]] == 3
+    assert _sinks(reduction, graph) == {5: 25, 6: 5}
+
+
+def test_leaves_stay_distinct_without_fold():
+    graph, order = _graph([(1, 3, 1), (2, 3, 2)])
+    reduction = optimize(graph, order, {'1': 4, '2': 4, '3': '+'})
+
+    assert reduction.merged == 0 and len(reduction.graph) == 3
+
+
+def test_fold():
+    graph, order = _graph(ARCS)
+    reduction = optimize(graph, order, OPERATIONS, fold=True)
+
+    # 3 folds to 5, 4 folds to the same constant and 5 to 25, 6 folds and is merged with 3
+    assert (reduction.folded, reduction.merged, reduction.removed) == (4, 2, 4)
+    assert reduction.operations == {'1': 5, '2': 25}
+    assert len(reduction.graph) == 2 and reduction.graph.arcs_count() == 0
+    assert _sinks(reduction, graph) == {5: 25, 6: 5}
+
+
+@pytest.mark.parametrize('kernel', ['scalar', 'floating'])
+def test_fold_stops_before_overflow(kernel):
+    graph, order = _graph(CHAIN)
+    reduction = optimize(graph, order, CHAIN_OPERATIONS, fold=True, kernel=kernel)
+
+    # exp(5) and exp(exp(5)) fold, the last exp is left to the backend
+    assert reduction.folded == 2
+    assert reduction.operations == {'1': math.exp(math.exp(5)), '2': 'exp'}
+
+
+def _eval(tmp_path, arcs, operations, *options):
+    graph = tmp_path / 'graph.txt'
+    graph.write_text(', '.join(f'({u}, {v}, {k})' for u, v, k in arcs))
+    operations_file = tmp_path / 'operations.txt'
+    operations_file.write_text(''.join(f'{v} : {op}\n' for v, op in operations.items()))
+    output = tmp_path / 'output.txt'
+    cli.main(['eval', '-i', str(graph), '--operations', str(operations_file), '-o', str(output), '--no-cache',
+              *options])
+    return output.read_text()
+
+
+def test_merged_sink_keeps_its_id(tmp_path):
+    expected = '5(3(1, 2), 3(1, 2)) = *(+(2, 3), +(2, 3)) = 25\n6(1, 2) = +(2, 3) = 5\n'
+
+    assert _eval(tmp_path, ARCS, OPERATIONS, '--optimize') == expected
+
+
+def test_fold_output(tmp_path):
+    assert _eval(tmp_path, ARCS, OPERATIONS, '--optimize', 'fold') == '5 = 25 = 25\n6 = 5 = 5\n'
+
+
+def test_log_goes_beyond_a_folded_float(tmp_path):
+    # the fold keeps the last exp for the log backend instead of giving inf
+    output = _eval(tmp_path, CHAIN, CHAIN_OPERATIONS, '--optimize', 'fold', '--numeric', 'log')
+
+    assert output == f'4(3) = exp({math.exp(math.exp(5))!r}) = exp({math.exp(math.exp(5))!r})\n'
@@ -0,0 +1,77 @@
+import os
+import random
+from array import array
+
+import pytest
+
+from graphnet import parallel
+from graphnet.graph import Graph
+from graphnet.operations import load_network
+from graphnet.plan import compile_plan, evaluate
+from graphnet.topology import topological_order
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _random_network(seed, leaves=20, inner=200, sinks=None):
+    # every inner vertex reads one to three earlier vertices, sinks=1 adds a
+    # vertex summing all the others
+    rnd = random.Random(seed)
+    tails, heads, orders = array('l'), array('l'), array('l')
+    operations = {str(v): rnd.randint(-3, 3) for v in range(1, leaves + 1)}
+    for v in range(leaves + 1, leaves + inner + 1):
+        arguments = rnd.sample(range(1, v), rnd.randint(1, min(3, v - 1)))
+        operations[str(v)] = rnd.choice(['+', '*', 'max']) if len(arguments) > 1 else 'relu'
+        for k, u in enumerate(arguments, 1):
+            tails.append(u)
+            heads.append(v)
+            orders.append(k)
+
+    size = leaves + inner
+    if sinks == 1:
+        size += 1
+        for k, u in enumerate(range(1, size), 1):
+            tails.append(u)
+            heads.append(size)
+            orders.append(k)
+        operations[str(size)] = '+'
+
+    graph = Graph.from_arcs(tails, heads, orders, size)
+    return compile_plan(graph, topological_order(graph), operations)
+
+
+@pytest.fixture(params=[1, 256])
+def min_share(request, monkeypatch):
+    # 1 sends every level to the pool, 256 keeps these small levels local
+    monkeypatch.setattr(parallel, 'MIN_SHARE', request.param)
+
+
+def test_sample(min_share):
+    plan = load_network(os.path.join(ROOT, 'input3.txt'), os.path.join(ROOT, 'operations3.txt'))[2]
+
+    assert parallel.evaluate_parallel(plan, 2) == evaluate(plan)
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('sinks', [None, 1])
+def test_random_networks(min_share, seed, sinks):
+    plan = _random_network(seed, sinks=sinks)
+
+    assert parallel.evaluate_parallel(plan, 2) == evaluate(plan)
+
+
+def test_constants(min_share):
+    plan = _random_network(7)
+    constants = [c + 1 for c in plan.constants]
+
+    assert parallel.evaluate_parallel(plan, 3, constants) == evaluate(plan, constants)
+
+
+def test_every_instruction_once():
+    plan = _random_network(3, sinks=1)
+    levels = parallel._level_sets(plan)
+
+    assert sorted(i for level in levels for i in level) == list(range(plan.leaves, len(plan)))
+    depth = {i: d for d, level in enumerate(levels, 1) for i in level}
+    for i in range(plan.leaves, len(plan)):
+        assert all(depth.get(s, 0) < depth[i] for s in plan.args[plan.arg_offsets[i]:plan.arg_offsets[i + 1]])
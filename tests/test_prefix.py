@@ -0,0 +1,57 @@
+import io
+import os
+from array import array
+
+import pytest
+
+from graphnet.cache import load_graph
+from graphnet.exceptions import CycleException
+from graphnet.graph import Graph
+from graphnet.prefix import cycle_finding, prefix_expressions, write_prefix
+from graphnet.topology import topological_order
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _write(file_name, shared=False):
+    graph, order = load_graph(os.path.join(ROOT, file_name))
+    out = io.StringIO()
+    write_prefix(out, graph, order, shared=shared)
+    return out.getvalue()
+
+
+def test_samples():
+    assert _write('input2.txt') == '4(3(2, 1, 2)), 5(1, 3(2, 1, 2), 6)'
+    assert _write('input3.txt') == '3(2(1, 5), 6), 4(2(1, 5), 5), 8(7(6))'
+
+
+def test_shared():
+    assert _write('input2.txt', shared=True) == 'let $3 = 3(2, 1, 2)\n4($3), 5(1, $3, 6)'
+    assert _write('input3.txt', shared=True) == 'let $2 = 2(1, 5)\n3($2, 6), 4($2, 5), 8(7(6))'
+
+
+def test_labels_and_outputs():
+    graph, _ = load_graph(os.path.join(ROOT, 'input3.txt'))
+    operations = {1: 4, 2: '+', 3: '*', 5: 7, 6: 5}
+
+    assert prefix_expressions(graph, lambda v: str(operations[v]), [3]) == {3: '*(+(4, 7), 5)'}
+    assert prefix_expressions(graph, outputs=[2, 3]) == {2: '2(1, 5)', 3: '3(2(1, 5), 6)'}
+
+
+def test_deep_chain():
+    # the stack replaces recursion, and the time is linear in the output
+    n = 100000
+    graph = Graph.from_arcs(array('l', range(1, n)), array('l', range(2, n + 1)), array('l', [1]) * (n - 1), n)
+    out = io.StringIO()
+    write_prefix(out, graph, topological_order(graph))
+
+    text = out.getvalue()
+    assert text.startswith(f'{n}({n - 1}(') and text.endswith('(1' + ')' * (n - 1))
+    assert prefix_expressions(graph) == {n: text}
+
+
+def test_no_sinks():
+    graph = Graph.from_arcs(array('l', [1, 2]), array('l', [2, 1]), array('l', [1, 1]), 2)
+
+    with pytest.raises(CycleException):
+        cycle_finding(graph, None, io.StringIO())
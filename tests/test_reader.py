@@ -0,0 +1,90 @@
+import pytest
+
+from graphnet.exceptions import InputException
+from graphnet.reader import iter_edges, read_graph
+
+# chunk sizes that cut the arcs at every possible place, and the default one
+CHUNK_SIZES = [1, 2, 3, 7, 16, None]
+
+
+def _write(tmp_path, text):
+    path = tmp_path / 'graph.txt'
+    path.write_bytes(text.encode())
+    return str(path)
+
+
+def _edges(file_name, chunk_size):
+    if chunk_size is None:
+        return list(iter_edges(file_name))
+    return list(iter_edges(file_name, chunk_size))
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_arcs_keep_their_lines(tmp_path, chunk_size):
+    file_name = _write(tmp_path, '(1, 2, 1), (2, 3, 2),\n(1, 3, 1),\n\n(3, 4, 1)\n')
+
+    assert _edges(file_name, chunk_size) == [(1, 2, 1, 1), (2, 3, 2, 1), (1, 3, 1, 2), (3, 4, 1, 4)]
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_unusual_layout(tmp_path, chunk_size):
+    # no spaces and an arc split over two lines go through the tokenizer, an
+    # arc belongs to the line of its first number
+    file_name = _write(tmp_path, '(1,2,1),(2,3,1),\n(  12 ,\n 3, 2 ) ,\t(3,4,1)\n')
+
+    assert _edges(file_name, chunk_size) == [(1, 2, 1, 1), (2, 3, 1, 1), (12, 3, 2, 2), (3, 4, 1, 3)]
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_syntax_error_line(tmp_path, chunk_size):
+    file_name = _write(tmp_path, '(1, 2, 1),\n(2, 3, 1),\n(3, x, 1)\n')
+
+    edges = iter_edges(file_name, chunk_size) if chunk_size else iter_edges(file_name)
+    assert [next(edges), next(edges)] == [(1, 2, 1, 1), (2, 3, 1, 2)]
+    with pytest.raises(InputException) as error:
+        next(edges)
+    assert error.value.line == 3
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_missing_comma(tmp_path, chunk_size):
+    file_name = _write(tmp_path, '(1, 2, 1)\n(2, 3, 1)')
+
+    with pytest.raises(InputException) as error:
+        _edges(file_name, chunk_size)
+    assert error.value.line == 2
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('text, line', [
+    ('(1, 2, 1),\n(0, 2, 2)', 2),
+    ('(1, 2, 1),\n(2, 3, 1), (3, 0, 1)', 2),
+    ('(0, 1, 1)', 1),
+])
+def test_vertex_zero(tmp_path, chunk_size, text, line):
+    file_name = _write(tmp_path, text)
+
+    with pytest.raises(InputException) as error:
+        _edges(file_name, chunk_size)
+    assert error.value.line == line
+    with pytest.raises(InputException) as error:
+        read_graph(file_name)
+    assert error.value.line == line
+
+
+def test_vertex_zero_after_syntax_error(tmp_path):
+    # the first error of the file is reported
+    file_name = _write(tmp_path, '(1, 2, 1),\n(2, ?, 1),\n(0, 3, 1)')
+
+    with pytest.raises(InputException) as error:
+        read_graph(file_name)
+    assert error.value.line == 2
+
+
+def test_read_graph(tmp_path):
+    graph = read_graph(_write(tmp_path, '(2, 3, 1), (1, 3, 2), (3, 4, 1)'))
+
+    assert len(graph) == 4
+    assert graph.arcs_count() == 3
+    assert list(graph.in_arcs(3)[0]) == [2, 1]
+    assert graph.sinks() == [4]
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import os
+import threading
+
+import pytest
+
+from graphnet.operations import load_network
+from graphnet.server import Network, handle_request, serve
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def networks():
+    plan = load_network(os.path.join(ROOT, 'input3.txt'), os.path.join(ROOT, 'operations3.txt'))[2]
+    return {'net': Network('net', plan)}
+
+
+def _handle(networks, request):
+    line = request if isinstance(request, str) else json.dumps(request)
+    return asyncio.run(handle_request(networks, line))
+
+
+def test_values(networks):
+    assert _handle(networks, {'id': 1}) == {'id': 1, 'values': {'3': 55, '4': 18, '8': 2.851123567946141e+64}}
+    assert _handle(networks, {'id': 2, 'graph': 'net', 'values': {'1': 5}})['values'] == \
+        {'3': 60, '4': 19, '8': 2.851123567946141e+64}
+
+
+def test_update(networks):
+    assert _handle(networks, {'id': 1, 'update': {'5': 8}}) == {'id': 1, 'changed': {'3': 60, '4': 20}}
+    assert _handle(networks, {'id': 2, 'update': {'5': 8}}) == {'id': 2, 'changed': {}}
+
+
+@pytest.mark.parametrize('request_line, error', [
+    ('{"graph": ["net"]}', 'Поле graph должно быть строкой'),
+    ('{"graph": {"net": 1}}', 'Поле graph должно быть строкой'),
+    ('{"graph": "other"}', 'Граф \'other\' не загружен'),
+    ('[1]', 'Запрос должен быть объектом'),
+    ('{"values": {"3": 1}}', 'Вершина \'3\' не является листом графа \'net\''),
+    ('{"update": {"1": "x"}}', 'Значение вершины \'1\' должно быть числом'),
+])
+def test_errors(networks, request_line, error):
+    assert _handle(networks, request_line)['error'] == error
+
+
+def test_evaluation_leaves_the_event_loop(networks, monkeypatch):
+    threads = []
+    evaluate = Network.evaluate
+
+    def recording(self, overrides):
+        threads.append(threading.current_thread())
+        return evaluate(self, overrides)
+
+    monkeypatch.setattr(Network, 'evaluate', recording)
+    assert 'values' in _handle(networks, {'id': 1})
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_connections(networks, tmp_path):
+    socket_path = str(tmp_path / 'server.sock')
+
+    async def client(request):
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+        writer.write(json.dumps(request).encode() + b'\n')
+        response = json.loads(await reader.readline())
+        writer.close()
+        return response
+
+    async def main():
+        server = asyncio.create_task(serve(networks, socket_path))
+        while not os.path.exists(socket_path):
+            await asyncio.sleep(0.01)
+        # a bad request fails alone, the connection and the server go on
+        responses = await asyncio.gather(client({'id': 1, 'graph': [1]}), client({'id': 2}))
+        server.cancel()
+        return responses
+
+    bad, good = asyncio.run(main())
+    assert bad == {'id': 1, 'error': 'Поле graph должно быть строкой'}
+    assert good['values']['3'] == 55
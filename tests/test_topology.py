@@ -0,0 +1,53 @@
+from array import array
+
+import pytest
+
+from graphnet.cli import error_message
+from graphnet.exceptions import CycleException
+from graphnet.graph import Graph
+from graphnet.topology import topological_order
+
+
+def _graph(arcs, size=0):
+    tails, heads, orders = (array('l', column) for column in zip(*arcs))
+    return Graph.from_arcs(tails, heads, orders, size)
+
+
+def _arcs(graph):
+    return {(u, v) for v in range(1, len(graph) + 1) for u in graph.in_arcs(v)[0]}
+
+
+def test_order_goes_forward():
+    graph = _graph([(3, 1, 1), (2, 1, 2), (3, 2, 1), (1, 4, 1)])
+
+    position = {v: i for i, v in enumerate(topological_order(graph))}
+    assert sorted(position) == [1, 2, 3, 4]
+    assert all(position[u] < position[v] for u, v in _arcs(graph))
+
+
+@pytest.mark.parametrize('arcs', [
+    [(1, 2, 1), (2, 1, 1)],
+    [(1, 1, 1)],
+    # a cycle reached from a vertex outside it
+    [(1, 2, 1), (2, 3, 1), (3, 4, 1), (4, 2, 2), (4, 5, 1)],
+    [(5, 4, 1), (4, 3, 1), (3, 5, 1), (1, 2, 1)],
+])
+def test_cycle_is_reported(arcs):
+    graph = _graph(arcs)
+
+    with pytest.raises(CycleException) as error:
+        topological_order(graph)
+
+    cycle = error.value.cycle
+    assert len(set(cycle)) == len(cycle)
+    # every vertex of the cycle has an arc to the next one
+    assert all((u, v) in _arcs(graph) for u, v in zip(cycle, cycle[1:] + cycle[:1]))
+    assert (error.value.v, error.value.u) == (cycle[0], cycle[1 % len(cycle)])
+
+
+def test_cycle_message():
+    with pytest.raises(CycleException) as error:
+        topological_order(_graph([(1, 2, 1), (2, 3, 1), (3, 1, 1)]))
+
+    assert error_message(error.value) == 'Существует цикл ' + ' -> '.join(
+        str(v) for v in error.value.cycle + error.value.cycle[:1])
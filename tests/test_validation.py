@@ -0,0 +1,54 @@
+from array import array
+
+import pytest
+
+from graphnet.exceptions import DataException
+from graphnet.reader import read_graph
+from graphnet.validation import NumberingValidator
+
+
+def _read(tmp_path, text):
+    path = tmp_path / 'graph.txt'
+    path.write_text(text)
+    return read_graph(str(path))
+
+
+def test_permutation_of_orders(tmp_path):
+    graph = _read(tmp_path, '(1, 3, 2), (2, 3, 3),\n(4, 3, 1)')
+
+    assert list(graph.in_arcs(3)[0]) == [4, 1, 2]
+
+
+@pytest.mark.parametrize('text, line', [
+    # the same order twice
+    ('(1, 3, 1),\n(2, 3, 1)', 2),
+    # order 3 with two arcs entering the vertex
+    ('(1, 3, 1),\n(2, 3, 3)', 2),
+    ('(1, 2, 1), (2, 3, 1),\n\n(1, 3, 2), (4, 3, 2)', 3),
+    # orders start from 1
+    ('(1, 2, 1),\n(1, 3, 0)', 2),
+])
+def test_wrong_numbering(tmp_path, text, line):
+    with pytest.raises(DataException) as error:
+        _read(tmp_path, text)
+
+    assert error.value.line == line
+    assert error.value.message.endswith(' 3')
+
+
+@pytest.mark.parametrize('orders', [[1, 0, 1], [1, 2, 2], [1, 1, 2]])
+def test_blocks_fail_like_arcs(orders):
+    heads = [3, 3, 4]
+    runs = [(1, 2), (5, 1)]
+    lines = [1, 1, 5]
+
+    one_by_one, by_block = NumberingValidator('graph.txt'), NumberingValidator('graph.txt')
+    failures = []
+    for numbering, add in [(one_by_one, lambda: [one_by_one.add(v, k, n) for v, k, n in zip(heads, orders, lines)]),
+                           (by_block, lambda: by_block.add_block(array('l', heads), array('l', orders), runs))]:
+        with pytest.raises(DataException) as error:
+            add()
+            numbering.finish(heads, orders)
+        failures.append((error.value.line, error.value.message))
+
+    assert failures[0] == failures[1]
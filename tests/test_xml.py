@@ -0,0 +1,71 @@
+import io
+import os
+
+import pytest
+
+from graphnet.exceptions import InputException
+from graphnet.reader import read_graph
+from graphnet.xml_format import XmlEdges, write_xml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ARC = '\t<arc>\n\t\t<from>v{}</from>\n\t\t<to>v{}</to>\n\t\t<order>{}</order>\n\t</arc>\n'
+
+
+def _columns(graph):
+    return [list(a) for a in (graph.offsets, graph.targets, graph.orders, graph.in_offsets, graph.sources,
+                              graph.in_orders)]
+
+
+@pytest.mark.parametrize('file_name', ['input.txt', 'input2.txt', 'input3.txt'])
+def test_round_trip(tmp_path, file_name):
+    graph = read_graph(os.path.join(ROOT, file_name))
+    out = io.StringIO()
+    write_xml(out, graph)
+    xml = tmp_path / 'graph.xml'
+    xml.write_text(out.getvalue())
+
+    assert _columns(read_graph(str(xml))) == _columns(graph)
+
+
+def test_arc_lines(tmp_path):
+    xml = tmp_path / 'graph.xml'
+    xml.write_text('<?xml version="1.0" ?>\n<graph>\n\t<vertex>v1</vertex>\n\t<vertex>v2</vertex>\n'
+                   + ARC.format(1, 2, 1) + ARC.format(2, 3, 1) + '</graph>\n')
+
+    edges = XmlEdges(str(xml))
+    # every arc comes with the line of its closing tag
+    assert list(edges) == [(1, 2, 1, 9), (2, 3, 1, 14)]
+    assert edges.vertices == 2
+
+
+@pytest.mark.parametrize('arc', [
+    ARC.format(0, 2, 1),
+    ARC.format(1, 2, 'x'),
+    ARC.format(1, 2, 1).replace('v2', 'w2'),
+    ARC.format(1, 2, 1).replace('\t\t<order>1</order>\n', '\t\t\n'),
+])
+def test_malformed_arc(tmp_path, arc):
+    xml = tmp_path / 'graph.xml'
+    xml.write_text('<graph>\n' + ARC.format(1, 2, 1) + arc + '</graph>\n')
+
+    edges = iter(XmlEdges(str(xml)))
+    assert next(edges) == (1, 2, 1, 6)
+    with pytest.raises(InputException) as error:
+        next(edges)
+    assert error.value.line == 11
+
+
+@pytest.mark.parametrize('text, line', [
+    ('<graph>\n\t<arc>\n\t\t<from>v1</to>\n', 3),
+    ('<graph>\n' + ARC.format(1, 2, 1) + '\t<arc>\n', 8),
+    ('<graph>\n<vertex>v1</vertex>\n&\n</graph>\n', 3),
+    ('<nodes>\n</nodes>\n', 1),
+])
+def test_parse_errors(tmp_path, text, line):
+    xml = tmp_path / 'graph.xml'
+    xml.write_text(text)
+
+    with pytest.raises(InputException) as error:
+        list(XmlEdges(str(xml)))
+    assert error.value.line == line